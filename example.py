@@ -32,6 +32,25 @@ async def example():
     author_archive = True  # 是否将每个作者的作品存至单独的文件夹
     write_mtime = True  # 是否将作品文件的 修改时间 修改为作品的发布时间
     markdown_record = True  # 是否在作品文件夹中生成Markdown格式的记录文件
+    concurrency = 4  # 批量处理作品链接时，同时处理的作品数量上限
+    request_rate = 2.0  # 请求同一主机的频率上限，单位：次/秒，设置为 0 表示不限制
+    segment_threshold = 1024 * 1024 * 16  # 视频分段下载阈值，单位：字节，0 表示关闭
+    segment_count = 4  # 分段下载时的分段数量
+    image_concurrency = 4  # 图片文件下载并发数量
+    video_concurrency = 2  # 视频文件下载并发数量
+    live_concurrency = 2  # 动图文件下载并发数量
+    adaptive_concurrency = False  # 是否根据请求延迟与错误率自动调整并发数量
+    max_connections = 100  # 连接池最大连接数量
+    max_keepalive_connections = 20  # 连接池最大保持连接数量
+    http2 = False  # 是否对 CDN 主机启用 HTTP/2，需要安装 h2 模块
+    link_cache_ttl = 12  # 作品短链接解析结果缓存小时数，设置为 0 不缓存
+    note_cache_ttl = 300  # 作品数据缓存秒数，设置为 0 不缓存
+    note_cache_size = 256  # 作品数据磁盘缓存容量上限，单位 MB
+    job_workers = 2  # Web API 后台任务同时处理数量
+    parse_workers = 0  # Web API 模式下解析作品页面的进程数量，设置为 0 在主进程解析
+    parse_warmup = True  # Web API 模式启动时是否预先启动解析进程
+    download_rate = 2.0  # 同一 CDN 主机的下载频率上限，单位：次/秒，0 表示不限制
+    bandwidth_limit = 0  # 下载带宽上限，单位：字节/秒，设置为 0 表示不限制
     read_cookie = None  # 读取浏览器 Cookie，支持设置浏览器名称（字符串）或者浏览器序号（整数），设置为 None 代表不读取
 
     # async with XHS() as xhs:
@@ -59,6 +78,25 @@ async def example():
         author_archive=author_archive,
         write_mtime=write_mtime,
         markdown_record=markdown_record,
+        concurrency=concurrency,
+        request_rate=request_rate,
+        segment_threshold=segment_threshold,
+        segment_count=segment_count,
+        image_concurrency=image_concurrency,
+        video_concurrency=video_concurrency,
+        live_concurrency=live_concurrency,
+        adaptive_concurrency=adaptive_concurrency,
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        http2=http2,
+        link_cache_ttl=link_cache_ttl,
+        note_cache_ttl=note_cache_ttl,
+        note_cache_size=note_cache_size,
+        job_workers=job_workers,
+        parse_workers=parse_workers,
+        parse_warmup=parse_warmup,
+        download_rate=download_rate,
+        bandwidth_limit=bandwidth_limit,
     ) as xhs:  # 使用自定义参数
         download = True  # 是否下载作品文件，默认值：False
         # 返回作品详细信息，包括下载地址
@@ -1,6 +1,7 @@
 from asyncio import run
 from asyncio.exceptions import CancelledError
 from contextlib import suppress
+from multiprocessing import freeze_support
 from sys import argv
 
 from source import Settings
@@ -28,6 +29,8 @@ async def server(
 
 
 if __name__ == "__main__":
+    # 打包后的程序启动解析进程时执行进程代码，而不是重新运行程序
+    freeze_support()
     with suppress(
             KeyboardInterrupt,
             CancelledError,
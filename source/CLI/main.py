@@ -58,8 +58,31 @@ class CLI:
     async def run(self):
         if self.url:
             await self.APP.extract_cli(self.url, index=self.index)
+            self.__print_summary()
         self.__update_settings()
 
+    def __print_summary(self):
+        metrics = self.APP.manager.metrics
+        if not (stages := metrics.summary()):
+            return
+        table = Table(highlight=True, box=None, show_header=True)
+        table.add_column(_("阶段"), no_wrap=True, style="bold")
+        table.add_column(_("次数"), justify="right")
+        table.add_column(_("总耗时"), justify="right")
+        table.add_column(_("平均耗时"), justify="right")
+        for stage, count, total, mean in stages:
+            table.add_row(stage, str(count), f"{total:.2f}s", f"{mean:.3f}s")
+        samples = metrics.collect()
+        retries = sum(value for labels, value in samples.get("xhs_retries_total", ()))
+        failures = sum(value for labels, value in samples.get("xhs_failures_total", ()))
+        received = sum(value for labels, value in samples.get("xhs_bytes_total", ()))
+        print(table)
+        print(
+            _("接收数据 {0:.2f} MB，重试 {1} 次，失败 {2} 次").format(
+                received / 1024 / 1024, int(retries), int(failures)
+            )
+        )
+
     def __update_settings(self):
         if self.update:
             self.settings.update(self.parameter)
@@ -188,6 +211,12 @@ class CLI:
                     width=55,
                 ),
             ),
+            (
+                "--bandwidth_limit",
+                "-bl",
+                "int",
+                _("下载带宽上限，单位：字节/秒，设置为 0 表示不限制"),
+            ),
             ("--language", "-l", "choice", _("设置程序语言，目前支持：zh_CN、en_US")),
             ("--settings", "-s", "str", _("读取指定配置文件")),
             (
@@ -316,6 +345,11 @@ class CLI:
     "-mdr",
     type=bool,
 )
+@option(
+    "--bandwidth_limit",
+    "-bl",
+    type=int,
+)
 @option(
     "--language",
     "-l",
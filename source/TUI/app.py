@@ -79,7 +79,7 @@ class XHSDownloader(App):
             ),
             name="index",
         )
-        self.install_screen(Loading(), name="loading")
+        self.install_screen(Loading(self.APP.manager.progress), name="loading")
         self.install_screen(About(), name="about")
         self.install_screen(
             Record(
@@ -129,7 +129,7 @@ class XHSDownloader(App):
             ),
             name="setting",
         )
-        self.install_screen(Loading(), name="loading")
+        self.install_screen(Loading(self.APP.manager.progress), name="loading")
         self.install_screen(About(), name="about")
         self.install_screen(
             Record(
@@ -154,7 +154,8 @@ class XHSDownloader(App):
         )
 
     async def close_database(self):
-        await self.APP.id_recorder.cursor.close()
-        await self.APP.id_recorder.database.close()
-        await self.APP.data_recorder.cursor.close()
-        await self.APP.data_recorder.database.close()
+        await self.APP.id_recorder.close()
+        await self.APP.data_recorder.close()
+        await self.APP.map_recorder.close()
+        await self.APP.link_recorder.close()
+        await self.APP.note_recorder.close()
@@ -1,9 +1,11 @@
 from textual.app import ComposeResult
-from textual.containers import Grid
+from textual.containers import Vertical
 from textual.screen import ModalScreen
 from textual.widgets import Label, LoadingIndicator
 
+from ..module import ProgressBus
 from ..translation import _
+from .progress import Progress
 
 __all__ = ["Loading"]
 
@@ -11,12 +13,15 @@ __all__ = ["Loading"]
 class Loading(ModalScreen):
     def __init__(
         self,
+        bus: ProgressBus,
     ):
         super().__init__()
+        self.bus = bus
 
     def compose(self) -> ComposeResult:
-        yield Grid(
+        yield Vertical(
             Label(_("程序处理中...")),
             LoadingIndicator(),
+            Progress(self.bus),
             classes="loading",
         )
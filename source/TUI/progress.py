@@ -1,9 +1,49 @@
+from textual import work
 from textual.app import ComposeResult
-from textual.screen import Screen
+from textual.containers import Horizontal, Vertical
+from textual.widgets import Label, ProgressBar
+
+from ..module import ProgressBus
 
 __all__ = ["Progress"]
 
 
-class Progress(Screen):
+class Progress(Vertical):
+    """订阅下载进度事件，为每个正在下载的文件显示一个进度条"""
+
+    def __init__(
+        self,
+        bus: ProgressBus,
+    ):
+        super().__init__(id="progress")
+        self.bus = bus
+        self.bars: dict[str, Horizontal] = {}
+
     def compose(self) -> ComposeResult:
-        pass
+        yield from ()
+
+    def on_mount(self) -> None:
+        self.watch_progress()
+
+    @work(exclusive=True)
+    async def watch_progress(self):
+        async for event in self.bus.subscribe():
+            match event["type"]:
+                case "finish":
+                    if row := self.bars.pop(event["name"], None):
+                        await row.remove()
+                case _:
+                    await self.__update(event)
+
+    async def __update(self, event: dict) -> None:
+        if not (row := self.bars.get(event["name"])):
+            row = self.bars[event["name"]] = Horizontal(
+                Label(event["name"]),
+                ProgressBar(show_eta=False),
+                classes="transfer",
+            )
+            await self.mount(row)
+        row.query_one(ProgressBar).update(
+            total=event["total"],
+            progress=event["completed"],
+        )
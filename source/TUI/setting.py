@@ -114,6 +114,36 @@ class Setting(Screen):
                 type="integer",
                 id="max_retry",
             ),
+            Label(
+                _("图片文件下载并发数量"),
+                classes="params",
+            ),
+            Input(
+                str(self.data["image_concurrency"]),
+                placeholder="4",
+                type="integer",
+                id="image_concurrency",
+            ),
+            Label(
+                _("视频文件下载并发数量"),
+                classes="params",
+            ),
+            Input(
+                str(self.data["video_concurrency"]),
+                placeholder="2",
+                type="integer",
+                id="video_concurrency",
+            ),
+            Label(
+                _("动图文件下载并发数量"),
+                classes="params",
+            ),
+            Input(
+                str(self.data["live_concurrency"]),
+                placeholder="2",
+                type="integer",
+                id="live_concurrency",
+            ),
             Label(),
             Container(
                 Checkbox(
@@ -219,7 +249,8 @@ class Setting(Screen):
     @on(Button.Pressed, "#save")
     def save_settings(self):
         self.dismiss(
-            {
+            self.data
+            | {
                 "mapping_data": self.data.get("mapping_data", {}),
                 "work_path": self.query_one("#work_path").value,
                 "folder_name": self.query_one("#folder_name").value,
@@ -230,6 +261,9 @@ class Setting(Screen):
                 "timeout": int(self.query_one("#timeout").value),
                 "chunk": int(self.query_one("#chunk").value),
                 "max_retry": int(self.query_one("#max_retry").value),
+                "image_concurrency": int(self.query_one("#image_concurrency").value),
+                "video_concurrency": int(self.query_one("#video_concurrency").value),
+                "live_concurrency": int(self.query_one("#live_concurrency").value),
                 "record_data": self.query_one("#record_data").value,
                 "image_format": self.query_one("#image_format").value,
                 "folder_mode": self.query_one("#folder_mode").value,
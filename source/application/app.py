@@ -1,13 +1,27 @@
-from asyncio import Event, Queue, QueueEmpty, create_task, gather, sleep
+from asyncio import (
+    Event,
+    Queue,
+    QueueEmpty,
+    Semaphore,
+    as_completed,
+    create_task,
+    gather,
+    sleep,
+)
 from contextlib import suppress
 from datetime import datetime
+from json import dumps
 from re import compile
 from urllib.parse import urlparse
 from pathlib import Path
 
 from aiofiles import open
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import (
+    PlainTextResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 
 # from aiohttp import web
 from pyperclip import copy, paste
@@ -16,7 +30,6 @@ from uvicorn import Config, Server
 from source.expansion import (
     BrowserCookie,
     Cleaner,
-    Converter,
     Namespace,
     beautify_string,
 )
@@ -24,29 +37,37 @@ from source.module import (
     __VERSION__,
     ERROR,
     MASTER,
+    MAX_WORKERS,
     REPOSITORY,
     ROOT,
     VERSION_BETA,
     VERSION_MAJOR,
     VERSION_MINOR,
     WARNING,
+    BatchParams,
+    ConcurrencyParams,
     DataRecorder,
     ExtractData,
     ExtractParams,
     IDRecorder,
+    JobData,
+    JobRecorder,
+    LinkRecorder,
     Manager,
+    NoteCache,
+    NoteRecorder,
     MapRecorder,
+    BandwidthLimiter,
+    Pipeline,
     logging,
-    sleep_time,
 )
 from source.translation import _, switch_language
 
 from ..module import Mapping
 from .download import Download
-from .explore import Explore
-from .image import Image
+from .job import JobQueue
+from .parser import NoteParser, ParserPool
 from .request import Html
-from .video import Video
 
 __all__ = ["XHS"]
 
@@ -107,6 +128,25 @@ class XHS:
         author_archive=False,
         write_mtime=False,
         markdown_record=False,
+        concurrency=4,
+        request_rate=2.0,
+        segment_threshold=1024 * 1024 * 16,
+        segment_count=4,
+        image_concurrency=MAX_WORKERS,
+        video_concurrency=2,
+        live_concurrency=2,
+        adaptive_concurrency=False,
+        max_connections=100,
+        max_keepalive_connections=20,
+        http2=False,
+        link_cache_ttl=12,
+        note_cache_ttl=300,
+        note_cache_size=256,
+        job_workers=2,
+        parse_workers=0,
+        parse_warmup=True,
+        download_rate=2.0,
+        bandwidth_limit=0,
         language="zh_CN",
         read_cookie: int | str = None,
         _print: bool = True,
@@ -114,6 +154,7 @@ class XHS:
         **kwargs,
     ):
         switch_language(language)
+        self.language = language
         self.manager = Manager(
             ROOT,
             work_path,
@@ -135,6 +176,25 @@ class XHS:
             author_archive,
             write_mtime,
             markdown_record,
+            concurrency,
+            request_rate,
+            segment_threshold,
+            segment_count,
+            image_concurrency,
+            video_concurrency,
+            live_concurrency,
+            adaptive_concurrency,
+            max_connections,
+            max_keepalive_connections,
+            http2,
+            link_cache_ttl,
+            note_cache_ttl,
+            note_cache_size,
+            job_workers,
+            parse_workers,
+            parse_warmup,
+            download_rate,
+            bandwidth_limit,
             _print,
         )
         self.mapping_data = mapping_data or {}
@@ -143,30 +203,22 @@ class XHS:
         )
         self.mapping = Mapping(self.manager, self.map_recorder)
         self.html = Html(self.manager)
-        self.image = Image()
-        self.video = Video()
-        self.explore = Explore()
-        self.convert = Converter()
+        self.parser = NoteParser()
+        self.parser_pool: ParserPool | None = None
         self.download = Download(self.manager)
         self.id_recorder = IDRecorder(self.manager)
         self.data_recorder = DataRecorder(self.manager)
+        self.link_recorder = LinkRecorder(self.manager)
+        self.note_recorder = NoteRecorder(self.manager)
+        self.note_cache = NoteCache(self.note_recorder)
+        self.manager.metrics.collector(self.collect_metrics)
         self.clipboard_cache: str = ""
         self.queue = Queue()
         self.event = Event()
         # self.runner = self.init_server()
         # self.site = None
         self.server = None
-
-    def __extract_image(self, container: dict, data: Namespace):
-        container["下载地址"], container["动图地址"] = self.image.get_image_link(
-            data, self.manager.image_format
-        )
-
-    def __extract_video(self, container: dict, data: Namespace):
-        container["下载地址"] = self.video.get_video_link(data)
-        container["动图地址"] = [
-            None,
-        ]
+        self.jobs: JobQueue | None = None
 
     async def __download_files(
         self,
@@ -175,9 +227,11 @@ class XHS:
         index,
         log,
         bar,
-    ):
+        bandwidth: BandwidthLimiter = None,
+    ) -> tuple[dict | None, list | None]:
         name = self.__naming_rules(container)
         work_path = None
+        result = None
         if (u := container["下载地址"]) and download:
             if await self.skip_download(i := container["作品ID"]):
                 logging(log, _("作品 {0} 存在下载记录，跳过下载").format(i))
@@ -195,12 +249,22 @@ class XHS:
                     log,
                     bar,
                     work_id=container["作品ID"],  # 传递作品ID
+                    bandwidth=bandwidth,
                 )
                 work_path = path_dict
-                await self.__add_record(i, result)
         elif not u:
             logging(log, _("提取作品文件下载地址失败"), ERROR)
-        
+        return work_path, result
+
+    async def __record_files(
+        self,
+        container: dict,
+        work_path: dict | None,
+        result: list | None,
+    ):
+        if result is not None:
+            await self.__add_record(container["作品ID"], result)
+
         # 保存Markdown记录（如果启用且有下载路径，或者强制生成到默认路径）
         if work_path or self.manager.markdown_record:
             # 如果没有下载路径但启用了Markdown记录，创建默认路径字典
@@ -391,25 +455,81 @@ class XHS:
         log=None,
         bar=None,
         data=True,
+        bandwidth_limit: int = None,
     ) -> list[dict]:
         # return  # 调试代码
+        # 每次运行重新读取一次下载文件夹的目录
+        self.download.folders.clear()
         urls = await self.extract_links(url, log)
         if not urls:
             logging(log, _("提取小红书作品链接失败"), WARNING)
         else:
             logging(log, _("共 {0} 个小红书作品待处理...").format(len(urls)))
         # return urls  # 调试代码
-        return [
-            await self.__deal_extract(
-                i,
-                download,
-                index,
+        urls, skipped, order = await self.plan_links(urls, data, log)
+        bandwidth = self.__bandwidth(bandwidth_limit)
+        # 请求、解析、下载、记录分阶段并发处理，不同作品的各阶段相互重叠
+        pipeline = (
+            Pipeline()
+            .stage(
+                "fetch",
+                lambda work: self.__fetch_note(work, log),
+                self.manager.concurrency,
+            )
+            .stage(
+                "parse",
+                lambda work: self.__parse_note(work, log),
+                self.parser_pool.size if self.parser_pool else 1,
+            )
+            .stage(
+                "download",
+                lambda work: self.__download_note(
+                    work,
+                    download,
+                    index,
+                    log,
+                    bar,
+                    bandwidth,
+                ),
+                sum(i.capacity for i in self.manager.scheduler.slots.values()),
+            )
+            .stage("record", lambda work: self.__record_note(work, log))
+        )
+        works = await pipeline.run(self.__create_work(i) for i in urls)
+        results = {i["id"]: i["result"] for i in works} | {
+            i: {"message": _("作品 {0} 存在下载记录，跳过处理").format(i)}
+            for i in skipped
+        }
+        # 按输入链接的顺序返回结果，重复链接返回相同的结果
+        return [results[i] for i in order]
+
+    async def plan_links(
+        self,
+        urls: list[str],
+        data: bool,
+        log,
+    ) -> tuple[list[str], list[str], list[str]]:
+        """处理作品前按作品 ID 去除重复链接，并一次性过滤存在下载记录的作品"""
+        # 返回待处理链接、跳过的作品 ID 以及每个输入链接对应的作品 ID
+        links = {}
+        order = [self.__extract_link_id(i) for i in urls]
+        for id_, url in zip(order, urls):
+            links.setdefault(id_, url)
+        duplicate = len(urls) - len(links)
+        skipped = [] if data else await self.id_recorder.select_many(list(links.keys()))
+        planned = [v for k, v in links.items() if k not in skipped]
+        if urls:
+            logging(
                 log,
-                bar,
-                data,
+                _(
+                    "计划处理 {0} 个作品，跳过存在下载记录的作品 {1} 个，重复链接 {2} 个"
+                ).format(
+                    len(planned),
+                    len(skipped),
+                    duplicate,
+                ),
             )
-            for i in urls
-        ]
+        return planned, [i for i in links if i in skipped], order
 
     async def extract_cli(
         self,
@@ -419,7 +539,9 @@ class XHS:
         log=None,
         bar=None,
         data=False,
+        bandwidth_limit: int = None,
     ) -> None:
+        self.download.folders.clear()
         url = await self.extract_links(url, log)
         if not url:
             logging(log, _("提取小红书作品链接失败"), WARNING)
@@ -431,23 +553,39 @@ class XHS:
                 log,
                 bar,
                 data,
+                bandwidth=self.__bandwidth(bandwidth_limit),
             )
 
     async def extract_links(self, url: str, log) -> list:
         urls = []
-        for i in url.split():
+        links = url.split()
+        short = {u.group() for i in links if (u := self.SHORT.search(i))}
+        # 并发解析短链接，请求数量由 Html 的并发限制器控制
+        resolved = dict(
+            zip(short, await gather(*[self.__resolve_short(i, log) for i in short]))
+        )
+        for i in links:
             if u := self.SHORT.search(i):
-                i = await self.html.request_url(
-                    u.group(),
-                    False,
-                    log,
-                )
+                i = resolved[u.group()]
             if u := self.SHARE.search(i):
                 urls.append(u.group())
             elif u := self.LINK.search(i):
                 urls.append(u.group())
         return urls
 
+    async def __resolve_short(self, url: str, log) -> str:
+        if cache := await self.link_recorder.select(url):
+            return cache[0]
+        if target := await self.html.request_url(
+            url,
+            False,
+            log,
+        ):
+            # 仅缓存作品链接，登录或验证页面等跳转结果不缓存
+            if self.SHARE.search(target) or self.LINK.search(target):
+                await self.link_recorder.add(url, target)
+        return target
+
     def extract_id(self, links: list[str]) -> list[str]:
         ids = []
         for i in links:
@@ -465,38 +603,141 @@ class XHS:
         data: bool,
         cookie: str = None,
         proxy: str = None,
+        planned: bool = False,
+        bandwidth: BandwidthLimiter = None,
     ):
-        if await self.skip_download(i := self.__extract_link_id(url)) and not data:
+        # 同一作品的并发请求只处理一次，共享处理结果
+        return await self.manager.flight.run(
+            (
+                "note",
+                self.__extract_link_id(url),
+                download,
+                data,
+                tuple(index or ()),
+            ),
+            self.__process_note,
+            url,
+            download,
+            index,
+            log,
+            bar,
+            data,
+            cookie,
+            proxy,
+            planned,
+            bandwidth,
+        )
+
+    async def __process_note(
+        self,
+        url: str,
+        download: bool,
+        index: list | tuple | None,
+        log,
+        bar,
+        data: bool,
+        cookie: str = None,
+        proxy: str = None,
+        planned: bool = False,
+        bandwidth: BandwidthLimiter = None,
+    ):
+        work = self.__create_work(url)
+        if not planned and not data and await self.skip_download(i := work["id"]):
             msg = _("作品 {0} 存在下载记录，跳过处理").format(i)
             logging(log, msg)
             return {"message": msg}
-        logging(log, _("开始处理作品：{0}").format(i))
-        html = await self.html.request_url(
-            url,
+        if (
+            await self.__fetch_note(work, log, cookie, proxy)
+            and await self.__parse_note(work, log)
+            and await self.__download_note(
+                work,
+                download,
+                index,
+                log,
+                bar,
+                bandwidth,
+            )
+        ):
+            await self.__record_note(work, log)
+        return work["result"]
+
+    def __bandwidth(self, limit: int | None) -> BandwidthLimiter | None:
+        """创建单次运行使用的带宽限制，同时受全局带宽限制约束"""
+        return self.manager.bandwidth.child(limit) if limit and limit > 0 else None
+
+    def __create_work(self, url: str) -> dict:
+        return {
+            "url": url,
+            "id": self.__extract_link_id(url),
+            "path": None,
+            "downloaded": None,
+            "result": {},
+        }
+
+    async def __fetch_note(
+        self,
+        work: dict,
+        log,
+        cookie: str = None,
+        proxy: str = None,
+    ) -> bool:
+        """请求作品页面，缓存命中时跳过请求，解析在下一阶段进行"""
+        logging(log, _("开始处理作品：{0}").format(i := work["id"]))
+        if cache := await self.note_cache.get(self.__cache_key(i)):
+            work["cache"] = cache
+            return True
+        if html := await self.manager.flight.run(
+            ("page", i, cookie, proxy),
+            self.html.request_url,
+            work["url"],
             log=log,
             cookie=cookie,
             proxy=proxy,
-        )
-        namespace = self.__generate_data_object(html)
-        if not namespace:
-            logging(log, _("{0} 获取数据失败").format(i), ERROR)
-            return {}
-        data = self.explore.run(namespace)
+        ):
+            work["html"] = html
+            return True
+        logging(log, _("{0} 获取数据失败").format(i), ERROR)
+        return False
+
+    async def __parse_note(self, work: dict, log) -> bool:
+        if self.parser_pool:
+            data = await self.__get_record(work)
+        else:
+            data = await self.__get_data(work)
+        if data is None:
+            logging(log, _("{0} 获取数据失败").format(work["id"]), ERROR)
+            return False
         # logging(log, data)  # 调试代码
         if not data:
-            logging(log, _("{0} 提取数据失败").format(i), ERROR)
-            return {}
-        if data["作品类型"] == _("视频"):
-            self.__extract_video(data, namespace)
-        elif data["作品类型"] == _("图文"):
-            self.__extract_image(data, namespace)
-        else:
-            data["下载地址"] = []
+            logging(log, _("{0} 提取数据失败").format(work["id"]), ERROR)
+            return False
         await self.update_author_nickname(data, log)
-        await self.__download_files(data, download, index, log, bar)
-        logging(log, _("作品处理完成：{0}").format(i))
-        await sleep_time()
-        return data
+        work["result"] = data
+        return True
+
+    async def __download_note(
+        self,
+        work: dict,
+        download: bool,
+        index,
+        log,
+        bar,
+        bandwidth: BandwidthLimiter = None,
+    ) -> bool:
+        work["path"], work["downloaded"] = await self.__download_files(
+            work["result"],
+            download,
+            index,
+            log,
+            bar,
+            bandwidth,
+        )
+        return True
+
+    async def __record_note(self, work: dict, log) -> bool:
+        await self.__record_files(work["result"], work["path"], work["downloaded"])
+        logging(log, _("作品处理完成：{0}").format(work["id"]))
+        return True
 
     async def update_author_nickname(
         self,
@@ -520,9 +761,42 @@ class XHS:
         link = urlparse(url)
         return link.path.split("/")[-1]
 
+    def __cache_key(self, id_: str) -> str:
+        # 解析进程缓存提取后的作品数据，下载地址与图片格式有关
+        if self.parser_pool:
+            return f"{id_}_{self.manager.image_format}"
+        return id_
+
+    async def __get_data(self, work: dict) -> dict | None:
+        """在主进程中解析作品页面，页面不包含作品数据时返回 None"""
+        if (cache := work.pop("cache", None)) is not None:
+            namespace = Namespace(cache)
+        else:
+            with self.manager.metrics.timer("parse"):
+                namespace = self.__generate_data_object(work.pop("html"))
+            await self.note_cache.put(work["id"], namespace.data)
+        if not namespace:
+            return None
+        with self.manager.metrics.timer("extract"):
+            return self.parser.extract(namespace, self.manager.image_format)
+
+    async def __get_record(self, work: dict) -> dict | None:
+        """在解析进程中解析作品页面，页面不包含作品数据时返回 None"""
+        if (cache := work.pop("cache", None)) is not None:
+            # 缓存数据在多个作品之间共享，复制一份避免相互修改
+            return dict(cache)
+        with self.manager.metrics.timer("parse", backend="process"):
+            record = await self.parser_pool.run(
+                work.pop("html"),
+                self.manager.image_format,
+            )
+        if record:
+            await self.note_cache.put(self.__cache_key(work["id"]), record)
+            return dict(record)
+        return record
+
     def __generate_data_object(self, html: str) -> Namespace:
-        data = self.convert.run(html)
-        return Namespace(data)
+        return self.parser.parse(html)
 
     def __naming_rules(self, data: dict) -> str:
         keys = self.manager.name_format.split()
@@ -609,6 +883,38 @@ class XHS:
     def stop_monitor(self):
         self.event.set()
 
+    def update_concurrency(
+        self,
+        image: int = None,
+        video: int = None,
+        live: int = None,
+        download_rate: float = None,
+        bandwidth_limit: int = None,
+    ) -> dict:
+        if download_rate is not None and download_rate >= 0:
+            self.manager.download_rate = download_rate
+            self.manager.download_pacer.update(download_rate)
+        if bandwidth_limit is not None and bandwidth_limit >= 0:
+            self.manager.bandwidth_limit = bandwidth_limit
+            self.manager.bandwidth.update(bandwidth_limit)
+        return self.manager.scheduler.update(
+            image=image,
+            video=video,
+            live=live,
+        )
+
+    def collect_metrics(self):
+        """作品数据缓存与后台任务队列的即时指标"""
+        cache = self.note_cache.status()
+        yield "xhs_cache_total", {"result": "memory_hit"}, cache["memory_hits"]
+        yield "xhs_cache_total", {"result": "disk_hit"}, cache["disk_hits"]
+        yield "xhs_cache_total", {"result": "miss"}, cache["misses"]
+        yield "xhs_queue_depth", {"queue": "monitor"}, self.queue.qsize()
+        if self.jobs:
+            jobs = self.jobs.status()
+            yield "xhs_queue_depth", {"queue": "jobs"}, jobs["queued"]
+            yield "xhs_queue_depth", {"queue": "jobs_running"}, jobs["running"]
+
     async def skip_download(self, id_: str) -> bool:
         return bool(await self.id_recorder.select(id_))
 
@@ -616,12 +922,16 @@ class XHS:
         await self.id_recorder.__aenter__()
         await self.data_recorder.__aenter__()
         await self.map_recorder.__aenter__()
+        await self.link_recorder.__aenter__()
+        await self.note_recorder.__aenter__()
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         await self.id_recorder.__aexit__(exc_type, exc_value, traceback)
         await self.data_recorder.__aexit__(exc_type, exc_value, traceback)
         await self.map_recorder.__aexit__(exc_type, exc_value, traceback)
+        await self.link_recorder.__aexit__(exc_type, exc_value, traceback)
+        await self.note_recorder.__aexit__(exc_type, exc_value, traceback)
         await self.close()
 
     async def close(self):
@@ -687,6 +997,47 @@ class XHS:
     #     await self.runner.cleanup()
     #     logging(log, _("Web API 服务器已关闭！"))
 
+    async def __stream_batch(self, batch: BatchParams):
+        """并发处理批量请求，每完成一项立即输出一行 JSON，index 为请求中的序号"""
+        semaphore = Semaphore(self.manager.concurrency)
+
+        async def deal(index: int, extract: ExtractParams):
+            async with semaphore:
+                try:
+                    result = await self.__handle_extract(extract)
+                except Exception as error:
+                    result = ExtractData(message=repr(error), params=extract, data=None)
+            return index, result
+
+        tasks = [create_task(deal(i, j)) for i, j in enumerate(batch.items)]
+        try:
+            for task in as_completed(tasks):
+                index, result = await task
+                yield (
+                    dumps(
+                        {"index": index} | result.model_dump(mode="json"),
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+        finally:
+            # 客户端断开连接时取消未完成的请求
+            for task in tasks:
+                task.cancel()
+
+    async def __stream_progress(self):
+        """以 Server-Sent Events 格式推送文件下载进度"""
+        async for event in self.manager.progress.subscribe():
+            yield f"event: {event['type']}\ndata: {dumps(event, ensure_ascii=False)}\n\n"
+
+    async def __get_job(self, job_id: str) -> JobData:
+        if not (job := await self.jobs.get(job_id)):
+            raise HTTPException(
+                status_code=404,
+                detail=_("任务 {0} 不存在").format(job_id),
+            )
+        return job
+
     async def run_server(
         self,
         host="0.0.0.0",
@@ -706,7 +1057,49 @@ class XHS:
             log_level=log_level,
         )
         server = Server(config)
-        await server.serve()
+        async with JobRecorder(self.manager) as recorder:
+            self.jobs = JobQueue(
+                self.__handle_extract,
+                recorder,
+                self.manager.job_workers,
+            )
+            await self.jobs.start()
+            if self.manager.parse_workers:
+                self.parser_pool = ParserPool(
+                    self.manager.parse_workers,
+                    self.language,
+                )
+                await self.parser_pool.start(self.manager.parse_warmup)
+            try:
+                await server.serve()
+            finally:
+                await self.jobs.stop()
+                if self.parser_pool:
+                    self.parser_pool.close()
+                    self.parser_pool = None
+
+    async def __handle_extract(self, extract: ExtractParams) -> ExtractData:
+        url = await self.extract_links(extract.url, None)
+        if not url:
+            msg = _("提取小红书作品链接失败")
+            data = None
+        else:
+            if data := await self.__deal_extract(
+                url[0],
+                extract.download,
+                extract.index,
+                None,
+                None,
+                not extract.skip,
+                extract.cookie,
+                extract.proxy,
+                bandwidth=self.__bandwidth(extract.bandwidth_limit),
+            ):
+                msg = _("获取小红书作品数据成功")
+            else:
+                msg = _("获取小红书作品数据失败")
+                data = None
+        return ExtractData(message=msg, params=extract, data=data)
 
     def setup_routes(self):
         @self.server.get("/")
@@ -718,23 +1111,98 @@ class XHS:
             response_model=ExtractData,
         )
         async def handle(extract: ExtractParams):
-            url = await self.extract_links(extract.url, None)
-            if not url:
-                msg = _("提取小红书作品链接失败")
-                data = None
-            else:
-                if data := await self.__deal_extract(
-                    url[0],
-                    extract.download,
-                    extract.index,
-                    None,
-                    None,
-                    not extract.skip,
-                    extract.cookie,
-                    extract.proxy,
-                ):
-                    msg = _("获取小红书作品数据成功")
-                else:
-                    msg = _("获取小红书作品数据失败")
-                    data = None
-            return ExtractData(message=msg, params=extract, data=data)
+            return await self.__handle_extract(extract)
+
+        @self.server.post("/xhs/batch")
+        async def handle_batch(batch: BatchParams):
+            return StreamingResponse(
+                self.__stream_batch(batch),
+                media_type="application/x-ndjson",
+            )
+
+        @self.server.get("/progress")
+        async def progress():
+            return StreamingResponse(
+                self.__stream_progress(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        @self.server.post(
+            "/jobs",
+            response_model=JobData,
+        )
+        async def submit_job(extract: ExtractParams):
+            return await self.jobs.submit(extract)
+
+        @self.server.get(
+            "/jobs/{job_id}",
+            response_model=JobData,
+            response_model_exclude={"result"},
+        )
+        async def job_status(job_id: str):
+            return await self.__get_job(job_id)
+
+        @self.server.get(
+            "/jobs/{job_id}/result",
+            response_model=ExtractData,
+        )
+        async def job_result(job_id: str):
+            if (job := await self.__get_job(job_id)).status in (
+                JobQueue.QUEUED,
+                JobQueue.RUNNING,
+            ):
+                raise HTTPException(
+                    status_code=409,
+                    detail=_("任务 {0} 尚未完成").format(job_id),
+                )
+            # 已取消的任务没有处理结果，返回任务的最终状态
+            return job.result or ExtractData(
+                message=_("任务 {0} 已结束，状态：{1}").format(job_id, job.status),
+                params=job.params,
+                data=None,
+            )
+
+        @self.server.delete(
+            "/jobs/{job_id}",
+            response_model=JobData,
+            response_model_exclude={"result"},
+        )
+        async def cancel_job(job_id: str):
+            if not (job := await self.jobs.cancel(job_id)):
+                raise HTTPException(
+                    status_code=404,
+                    detail=_("任务 {0} 不存在").format(job_id),
+                )
+            return job
+
+        @self.server.get("/download/concurrency")
+        async def concurrency():
+            return self.manager.scheduler.status()
+
+        @self.server.get("/metrics/concurrency")
+        async def concurrency_metrics():
+            return {
+                "request": self.manager.request_limiter.status(),
+            } | self.manager.scheduler.status()
+
+        @self.server.get("/metrics", response_class=PlainTextResponse)
+        async def metrics():
+            return PlainTextResponse(
+                self.manager.metrics.render(),
+                media_type="text/plain; version=0.0.4",
+            )
+
+        @self.server.get("/metrics/cache")
+        async def cache_metrics():
+            return self.note_cache.status()
+
+        @self.server.post("/download/concurrency")
+        async def update_concurrency(params: ConcurrencyParams):
+            return self.update_concurrency(
+                params.image,
+                params.video,
+                params.live,
+                params.download_rate,
+                params.bandwidth_limit,
+            )
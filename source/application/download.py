@@ -1,6 +1,8 @@
-from asyncio import Semaphore, gather
+from asyncio import create_task, gather
 from pathlib import Path
+from time import monotonic
 from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
 
 from aiofiles import open
 from httpx import HTTPError
@@ -12,9 +14,9 @@ from ..module import (
     ERROR,
     FILE_SIGNATURES,
     FILE_SIGNATURES_LENGTH,
-    MAX_WORKERS,
+    FolderIndex,
+    classify_error,
     logging,
-    sleep_time,
 )
 from ..module import retry as re_download
 from ..translation import _
@@ -22,13 +24,12 @@ from ..translation import _
 if TYPE_CHECKING:
     from httpx import AsyncClient
 
-    from ..module import Manager
+    from ..module import BandwidthLimiter, Manager
 
 __all__ = ["Download"]
 
 
 class Download:
-    SEMAPHORE = Semaphore(MAX_WORKERS)
     CONTENT_TYPE_MAP = {
         "image/png": "png",
         "image/jpeg": "jpeg",
@@ -48,8 +49,15 @@ class Download:
         self.temp = manager.temp
         self.chunk = manager.chunk
         self.client: "AsyncClient" = manager.download_client
+        self.scheduler = manager.scheduler
+        self.pacer = manager.download_pacer
+        self.bandwidth = manager.bandwidth
+        self.folders = FolderIndex()
+        self.flight = manager.flight
+        self.progress = manager.progress
+        self.metrics = manager.metrics
         self.headers = manager.blank_headers
-        self.retry = manager.retry
+        self.retry = manager.retry_policy
         self.folder_mode = manager.folder_mode
         self.video_format = "mp4"
         self.live_format = "mp4"
@@ -66,6 +74,8 @@ class Download:
         self.live_download = manager.live_download
         self.author_archive = manager.author_archive
         self.write_mtime = manager.write_mtime
+        self.segment_threshold = manager.segment_threshold
+        self.segment_count = manager.segment_count
 
     async def run(
         self,
@@ -79,8 +89,15 @@ class Download:
         log,
         bar,
         work_id: str = None,  # 新增作品ID参数
+        bandwidth: "BandwidthLimiter" = None,
     ) -> tuple[dict, list[Any]]:
         path_dict = self.__generate_path(nickname, filename)
+        # 每个文件夹只读取一次目录，之后使用内存索引判断文件是否存在
+        await self.folders.load(
+            path_dict["images"],
+            path_dict["videos"],
+            path_dict["livePhotos"],
+        )
         if type_ == _("视频"):
             tasks = self.__ready_download_video(
                 urls,
@@ -102,7 +119,9 @@ class Download:
         else:
             raise ValueError
         tasks = [
-            self.__download(
+            self.flight.run(
+                ("media", url),
+                self.__download,
                 url,
                 target_path,
                 name,
@@ -110,8 +129,10 @@ class Download:
                 mtime,
                 log,
                 bar,
+                kind,
+                bandwidth or self.bandwidth,
             )
-            for url, target_path, name, format_ in tasks
+            for url, target_path, name, format_, kind in tasks
         ]
         tasks = await gather(*tasks)
         return path_dict, tasks
@@ -152,7 +173,7 @@ class Download:
         if self.__check_exists_path(path_dict['videos'], video_filename, log):
             return []
         
-        return [(urls[0], path_dict['videos'], work_id, self.video_format)]
+        return [(urls[0], path_dict['videos'], work_id, self.video_format, "video")]
 
     def __ready_download_image(
         self,
@@ -183,7 +204,9 @@ class Download:
                 )
                 for s in self.image_format_list
             ):
-                tasks.append([j[0], path_dict['images'], image_filename, self.image_format])
+                tasks.append(
+                    [j[0], path_dict['images'], image_filename, self.image_format, "image"]
+                )
             
             # 处理动态照片，保存到livePhotos目录
             if (
@@ -196,7 +219,9 @@ class Download:
                 )
             ):
                 continue
-            tasks.append([j[1], path_dict['livePhotos'], image_filename, self.live_format])
+            tasks.append(
+                [j[1], path_dict['livePhotos'], image_filename, self.live_format, "live"]
+            )
         return tasks
 
     def __check_exists_glob(
@@ -216,7 +241,7 @@ class Download:
         name: str,
         log,
     ) -> bool:
-        if path.joinpath(name).exists():
+        if self.folders.exists(path, name):
             logging(log, _("{0} 文件已存在，跳过下载").format(name))
             return True
         return False
@@ -231,8 +256,13 @@ class Download:
         mtime: int,
         log,
         bar,
+        kind: str = "image",
+        bandwidth: "BandwidthLimiter" = None,
     ):
-        async with self.SEMAPHORE:
+        bandwidth = bandwidth or self.bandwidth
+        # 先按主机间隔等待再获取下载并发数量，等待期间其他主机的文件可以继续下载
+        await self.pacer.wait(url)
+        async with self.scheduler.slot(kind) as slot:
             headers = self.headers.copy()
             # try:
             #     length, suffix = await self.__head_file(
@@ -250,32 +280,23 @@ class Download:
             #     return False
             # temp = self.temp.joinpath(f"{name}.{suffix}")
             temp = self.temp.joinpath(f"{name}.{format_}")
-            self.__update_headers_range(
-                headers,
-                temp,
-            )
+            host = urlparse(url).hostname or ""
             try:
-                async with self.client.stream(
-                    "GET",
-                    url,
-                    headers=headers,
-                ) as response:
-                    await sleep_time()
-                    if response.status_code == 416:
-                        raise CacheError(
-                            _("文件 {0} 缓存异常，重新下载").format(temp.name),
-                        )
-                    response.raise_for_status()
-                    # self.__create_progress(
-                    #     bar,
-                    #     int(
-                    #         response.headers.get(
-                    #             'content-length', 0)) or None,
-                    # )
-                    async with open(temp, "ab") as f:
-                        async for chunk in response.aiter_bytes(self.chunk):
-                            await f.write(chunk)
-                            # self.__update_progress(bar, len(chunk))
+                with self.metrics.timer("download", host=host, kind=kind):
+                    latency = await self.__download_stream(
+                        url,
+                        headers,
+                        temp,
+                        bandwidth,
+                        kind == "video",
+                    )
+                slot.feedback(latency)
+                self.metrics.inc(
+                    "xhs_requests_total",
+                    stage="download",
+                    host=host,
+                    status="ok",
+                )
                 real = await self.__suffix_with_file(
                     temp,
                     path,
@@ -290,11 +311,20 @@ class Download:
                     mtime,
                     self.write_mtime,
                 )
-                # self.__create_progress(bar, None)
+                self.folders.add(real)
+                self.progress.finish(temp.name, True)
                 logging(log, _("文件 {0} 下载成功").format(real.name))
                 return True
             except HTTPError as error:
-                # self.__create_progress(bar, None)
+                slot.feedback(error=error)
+                self.retry.record(error)
+                self.progress.finish(temp.name, False)
+                self.metrics.inc(
+                    "xhs_requests_total",
+                    stage="download",
+                    host=host,
+                    status=classify_error(error),
+                )
                 logging(
                     log,
                     _("网络异常，{0} 下载失败，错误信息: {1}").format(
@@ -304,6 +334,7 @@ class Download:
                 )
                 return False
             except CacheError as error:
+                self.progress.finish(temp.name, False)
                 self.manager.delete(temp)
                 logging(
                     log,
@@ -311,19 +342,173 @@ class Download:
                     ERROR,
                 )
 
-    @staticmethod
-    def __create_progress(
-        bar,
-        total: int | None,
-        completed=0,
-    ):
-        if bar:
-            bar.update(total=total, completed=completed)
+    async def __download_stream(
+        self,
+        url: str,
+        headers: dict[str, str],
+        temp: Path,
+        bandwidth: "BandwidthLimiter",
+        segmented: bool = False,
+    ) -> float:
+        """下载文件，返回首字节延迟；大文件支持范围请求时改为分段并发下载"""
+        position = self.__update_headers_range(
+            headers,
+            temp,
+        )
+        start = monotonic()
+        async with self.client.stream(
+            "GET",
+            url,
+            headers=headers,
+        ) as response:
+            latency = monotonic() - start
+            if response.status_code == 416:
+                raise CacheError(
+                    _("文件 {0} 缓存异常，重新下载").format(temp.name),
+                )
+            response.raise_for_status()
+            length = int(response.headers.get("content-length", 0))
+            if segmented and self.__can_split(response, position, length):
+                await self.__download_segmented(
+                    url,
+                    headers,
+                    temp,
+                    response,
+                    length,
+                    bandwidth,
+                )
+                return latency
+            self.progress.start(
+                temp.name,
+                position + length if length else None,
+                position,
+            )
+            async with open(temp, "ab") as f:
+                async for chunk in response.aiter_bytes(bandwidth.chunk(self.chunk)):
+                    await f.write(chunk)
+                    self.progress.advance(temp.name, len(chunk))
+                    await bandwidth.consume(len(chunk))
+            self.__count_bytes(url, response)
+        return latency
+
+    def __can_split(self, response, position: int, length: int) -> bool:
+        """从头开始下载、服务器支持范围请求且文件大小达到阈值时分段下载"""
+        return (
+            self.segment_count >= 2
+            and bool(self.segment_threshold)
+            and position == 0
+            and response.status_code == 206
+            and length >= self.segment_threshold
+        )
+
+    async def __download_segmented(
+        self,
+        url: str,
+        headers: dict[str, str],
+        temp: Path,
+        response,
+        length: int,
+        bandwidth: "BandwidthLimiter",
+    ) -> None:
+        """分段并发下载大文件，已建立的响应作为第一段继续读取，不需要额外的探测请求"""
+        async with open(temp, "wb") as f:
+            await f.truncate(length)
+        self.progress.start(temp.name, length)
+        ranges = self.__split_range(length, self.segment_count)
+        (first, last), *others = ranges
+        tasks = [
+            create_task(self.__write_range(response, temp, first, last, bandwidth))
+        ]
+        tasks += [
+            create_task(
+                self.__download_segment(
+                    url,
+                    headers,
+                    temp,
+                    start,
+                    end,
+                    bandwidth,
+                )
+            )
+            for start, end in others
+        ]
+        try:
+            received = await gather(*tasks)
+        except BaseException:
+            # 任意一段失败时停止全部分段，确保没有残留的写入后再删除缓存文件
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            self.manager.delete(temp)
+            raise
+        self.__count_bytes(url, response)
+        # 文件已预先分配大小，需要检查每一段实际写入的数据量
+        if any(i != end - start + 1 for i, (start, end) in zip(received, ranges)):
+            self.manager.delete(temp)
+            raise CacheError(
+                _("文件 {0} 缓存异常，重新下载").format(temp.name),
+            )
+
+    async def __download_segment(
+        self,
+        url: str,
+        headers: dict[str, str],
+        temp: Path,
+        start: int,
+        end: int,
+        bandwidth: "BandwidthLimiter",
+    ) -> int:
+        async with self.client.stream(
+            "GET",
+            url,
+            headers=headers | {"Range": f"bytes={start}-{end}"},
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise CacheError(
+                    _("文件 {0} 缓存异常，重新下载").format(temp.name),
+                )
+            received = await self.__write_range(response, temp, start, end, bandwidth)
+            self.__count_bytes(url, response)
+            return received
+
+    async def __write_range(
+        self,
+        response,
+        temp: Path,
+        start: int,
+        end: int,
+        bandwidth: "BandwidthLimiter",
+    ) -> int:
+        """将响应数据写入文件的指定范围，读取到范围末尾后停止，返回写入的数据量"""
+        size = end - start + 1
+        received = 0
+        async with open(temp, "r+b") as f:
+            await f.seek(start)
+            async for chunk in response.aiter_bytes(bandwidth.chunk(self.chunk)):
+                chunk = chunk[: size - received]
+                await f.write(chunk)
+                received += len(chunk)
+                self.progress.advance(temp.name, len(chunk))
+                await bandwidth.consume(len(chunk))
+                if received >= size:
+                    break
+        return received
+
+    def __count_bytes(self, url: str, response) -> None:
+        self.metrics.inc(
+            "xhs_bytes_total",
+            response.num_bytes_downloaded,
+            stage="download",
+            host=urlparse(url).hostname or "",
+        )
 
     @staticmethod
-    def __update_progress(bar, advance: int):
-        if bar:
-            bar.advance(advance)
+    def __split_range(length: int, count: int) -> list[tuple[int, int]]:
+        size = -(-length // count)
+        return [
+            (start, min(start + size, length) - 1) for start in range(0, length, size)
+        ]
 
     @classmethod
     def __extract_type(cls, content: str) -> str:
@@ -339,7 +524,6 @@ class Download:
             url,
             headers=headers,
         )
-        await sleep_time()
         response.raise_for_status()
         suffix = self.__extract_type(response.headers.get("Content-Type")) or suffix
         length = response.headers.get("Content-Length", 0)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from ..expansion import Namespace
+from ..expansion import AttributeChain, Namespace
 from ..translation import _
 
 __all__ = ["Explore"]
@@ -8,68 +8,112 @@ __all__ = ["Explore"]
 
 class Explore:
     time_format = "%Y-%m-%d_%H:%M:%S"
+    # 字段名称、属性链、默认值、转换方法名称
+    FIELDS = (
+        ("收藏数量", "interactInfo.collectedCount", "-1", None),
+        ("评论数量", "interactInfo.commentCount", "-1", None),
+        ("分享数量", "interactInfo.shareCount", "-1", None),
+        ("点赞数量", "interactInfo.likedCount", "-1", None),
+        ("作品标签", "tagList", [], "_join_tags"),
+        ("作品ID", "noteId", "", None),
+        ("作品链接", "noteId", "", "_work_link"),
+        ("作品标题", "title", "", None),
+        ("作品描述", "desc", "", None),
+        ("作品类型", "type", "", "_work_type"),
+        # ("IP归属地", "ipLocation", "", None),
+        ("发布时间", "time", "", "_format_time"),
+        ("最后更新时间", "lastUpdateTime", "", "_format_time"),
+        ("时间戳", "time", "", "_timestamp"),
+        ("作者昵称", "user.nickname", "", None),
+        ("作者ID", "user.userId", "", None),
+        ("作者链接", "user.userId", "", "_author_link"),
+    )
 
     def __init__(self):
         self.explore_type = {"video": _("视频"), "normal": _("图文")}
+        self.unknown = _("未知")
+        self.plan = self.compile_fields(self.FIELDS)
+
+    def compile_fields(self, fields: tuple) -> tuple:
+        return tuple(
+            (
+                key,
+                Namespace.compile(chain),
+                default,
+                getattr(self, transform) if transform else None,
+            )
+            for key, chain, default, transform in fields
+        )
 
     def run(self, data: Namespace) -> dict:
         return self.__extract_data(data)
 
     def __extract_data(self, data: Namespace) -> dict:
-        result = {}
-        if data:
-            self.__extract_interact_info(result, data)
-            self.__extract_tags(result, data)
-            self.__extract_info(result, data)
-            self.__extract_time(result, data)
-            self.__extract_user(result, data)
-        return result
+        if not data:
+            return {}
+        data = data.data
+        return {
+            key: transform(getter(data, default))
+            if transform
+            else getter(data, default)
+            for key, getter, default, transform in self.plan
+        }
 
     @staticmethod
-    def __extract_interact_info(container: dict, data: Namespace) -> None:
-        container["收藏数量"] = data.safe_extract("interactInfo.collectedCount", "-1")
-        container["评论数量"] = data.safe_extract("interactInfo.commentCount", "-1")
-        container["分享数量"] = data.safe_extract("interactInfo.shareCount", "-1")
-        container["点赞数量"] = data.safe_extract("interactInfo.likedCount", "-1")
+    def _join_tags(tags: list) -> str:
+        return " ".join(Namespace.object_extract(i, "name") for i in tags)
 
     @staticmethod
-    def __extract_tags(container: dict, data: Namespace):
-        tags = data.safe_extract("tagList", [])
-        container["作品标签"] = " ".join(
-            Namespace.object_extract(i, "name") for i in tags
-        )
+    def _work_link(id_: str) -> str:
+        return f"https://www.xiaohongshu.com/explore/{id_}"
 
-    def __extract_info(self, container: dict, data: Namespace):
-        container["作品ID"] = data.safe_extract("noteId")
-        container["作品链接"] = (
-            f"https://www.xiaohongshu.com/explore/{container['作品ID']}"
-        )
-        container["作品标题"] = data.safe_extract("title")
-        container["作品描述"] = data.safe_extract("desc")
-        container["作品类型"] = self.explore_type.get(
-            data.safe_extract("type"), _("未知")
-        )
-        # container["IP归属地"] = data.safe_extract("ipLocation")
+    @staticmethod
+    def _author_link(id_: str) -> str:
+        return f"https://www.xiaohongshu.com/user/profile/{id_}"
 
-    def __extract_time(self, container: dict, data: Namespace):
-        container["发布时间"] = (
+    def _work_type(self, type_: str) -> str:
+        return self.explore_type.get(type_, self.unknown)
+
+    def _format_time(self, time: int) -> str:
+        return (
             datetime.fromtimestamp(time / 1000).strftime(self.time_format)
-            if (time := data.safe_extract("time"))
-            else _("未知")
-        )
-        container["最后更新时间"] = (
-            datetime.fromtimestamp(last / 1000).strftime(self.time_format)
-            if (last := data.safe_extract("lastUpdateTime"))
-            else _("未知")
-        )
-        container["时间戳"] = (
-            (time / 1000) if (time := data.safe_extract("time")) else None
+            if time
+            else self.unknown
         )
 
     @staticmethod
-    def __extract_user(container: dict, data: Namespace):
-        container["作者昵称"] = data.safe_extract("user.nickname")
-        container["作者ID"] = data.safe_extract("user.userId")
-        container["作者链接"] = (
-            f"https://www.xiaohongshu.com/user/profile/{container['作者ID']}"
+    def _timestamp(time: int) -> float | None:
+        return (time / 1000) if time else None
+
+
+if __name__ == "__main__":
+    # 字段提取耗时对比，参数为保存作品数据（note 字典列表）的 JSON 文件路径
+    # python -m source.application.explore notes.json
+    from json import loads
+    from pathlib import Path
+    from sys import argv
+    from timeit import timeit
+
+    demo = Explore()
+    for file in argv[1:]:
+        notes = [Namespace(i) for i in loads(Path(file).read_text(encoding="utf-8"))]
+
+        def dynamic():
+            for note in notes:
+                for key, chain, default, transform in demo.FIELDS:
+                    value = AttributeChain(chain)(note.data, default)
+                    if transform:
+                        getattr(demo, transform)(value)
+
+        def compiled():
+            for note in notes:
+                demo.run(note)
+
+        dynamic_time = timeit(dynamic, number=5) / 5
+        compiled_time = timeit(compiled, number=5) / 5
+        print(
+            f"{Path(file).name}: {len(notes)} notes, "
+            f"dynamic {dynamic_time / len(notes) * 1e6:.2f} µs/note, "
+            f"compiled {compiled_time / len(notes) * 1e6:.2f} µs/note, "
+            f"{dynamic_time / compiled_time:.1f}x"
         )
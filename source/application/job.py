@@ -0,0 +1,189 @@
+from asyncio import CancelledError, Queue, Task, create_task, gather
+from contextlib import suppress
+from json import loads
+from time import time
+from typing import TYPE_CHECKING, Awaitable, Callable
+from uuid import uuid4
+
+from ..module import ERROR, ExtractData, ExtractParams, JobData, logging
+from ..translation import _
+
+if TYPE_CHECKING:
+    from ..module import JobRecorder
+
+__all__ = ["JobQueue"]
+
+
+class JobQueue:
+    """Web API 后台任务队列，固定数量的工作协程按提交顺序处理任务"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    # 已结束的任务保留时间，单位：秒
+    RETENTION = 7 * 24 * 3600
+    PURGE_INTERVAL = 3600
+
+    def __init__(
+        self,
+        handler: Callable[[ExtractParams], Awaitable[ExtractData]],
+        recorder: "JobRecorder",
+        workers: int,
+    ):
+        self.handler = handler
+        self.recorder = recorder
+        self.size = max(workers, 1)
+        self.queue: Queue[str] = Queue()
+        self.jobs: dict[str, JobData] = {}
+        self.running: dict[str, Task] = {}
+        self.workers: list[Task] = []
+        # Cookie 仅保存在内存中，不写入数据库，也不在任务状态中返回
+        self.cookies: dict[str, str] = {}
+        self.purged = 0.0
+
+    async def start(self) -> None:
+        """恢复上次未完成的任务并启动工作协程"""
+        await self.__purge()
+        for row in await self.recorder.all():
+            job = self.__load(row)
+            job.status = self.QUEUED
+            self.jobs[job.id] = job
+            self.queue.put_nowait(job.id)
+        if self.jobs:
+            logging(None, _("已恢复 {0} 个未完成的任务").format(len(self.jobs)))
+        self.workers = [create_task(self.__work()) for _ in range(self.size)]
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+    async def submit(self, params: ExtractParams) -> JobData:
+        now = time()
+        job = JobData(
+            id=uuid4().hex,
+            status=self.QUEUED,
+            params=params.model_copy(update={"cookie": None}),
+            created=now,
+            updated=now,
+        )
+        if params.cookie:
+            self.cookies[job.id] = params.cookie
+        self.jobs[job.id] = job
+        await self.__save(job)
+        # 立即提交，保证排队中的任务在服务重启后仍然存在
+        await self.recorder.flush()
+        self.queue.put_nowait(job.id)
+        return job
+
+    async def get(self, id_: str) -> JobData | None:
+        if job := self.jobs.get(id_):
+            return job
+        if row := await self.recorder.select(id_):
+            return self.__load(row)
+        return None
+
+    async def cancel(self, id_: str) -> JobData | None:
+        if not (job := self.jobs.get(id_)):
+            return await self.get(id_)
+        if job.status == self.QUEUED:
+            await self.__finish(job, self.CANCELLED)
+        elif task := self.running.get(id_):
+            job.status = self.CANCELLED
+            task.cancel()
+        return job
+
+    def status(self) -> dict:
+        return {
+            "workers": self.size,
+            # 队列中仍然保留已取消的任务 ID，按任务状态统计
+            "queued": sum(i.status == self.QUEUED for i in self.jobs.values()),
+            "running": len(self.running),
+        }
+
+    async def __work(self) -> None:
+        while True:
+            id_ = await self.queue.get()
+            try:
+                if (job := self.jobs.get(id_)) and job.status == self.QUEUED:
+                    await self.__run(job)
+            finally:
+                self.queue.task_done()
+
+    async def __run(self, job: JobData) -> None:
+        job.status = self.RUNNING
+        await self.__save(job)
+        params = job.params.model_copy(update={"cookie": self.cookies.get(job.id)})
+        task = self.running[job.id] = create_task(self.handler(params))
+        try:
+            result = await task
+        except CancelledError:
+            if job.status != self.CANCELLED:
+                # 服务关闭导致的中断，保留任务等待下次启动时恢复
+                task.cancel()
+                job.status = self.QUEUED
+                with suppress(CancelledError):
+                    await self.__save(job)
+                raise
+            await self.__finish(job, self.CANCELLED)
+        except Exception as error:
+            logging(
+                None, _("任务 {0} 执行失败：{1}").format(job.id, repr(error)), ERROR
+            )
+            await self.__finish(
+                job,
+                self.FAILED,
+                ExtractData(message=repr(error), params=job.params, data=None),
+            )
+        else:
+            await self.__finish(job, self.COMPLETED, result)
+        finally:
+            self.running.pop(job.id, None)
+
+    async def __finish(
+        self,
+        job: JobData,
+        status: str,
+        result: ExtractData = None,
+    ) -> None:
+        job.status = status
+        job.result = result and result.model_copy(update={"params": job.params})
+        await self.__save(job)
+        # 已结束的任务仅保存在数据库中
+        self.jobs.pop(job.id, None)
+        self.cookies.pop(job.id, None)
+        if job.updated - self.purged > self.PURGE_INTERVAL:
+            await self.__purge()
+
+    async def __purge(self) -> None:
+        self.purged = time()
+        await self.recorder.purge(
+            (self.COMPLETED, self.FAILED, self.CANCELLED),
+            self.purged - self.RETENTION,
+        )
+
+    async def __save(self, job: JobData) -> None:
+        job.updated = time()
+        await self.recorder.add(
+            job.id,
+            job.status,
+            job.params.model_dump_json(),
+            job.result.model_dump_json() if job.result else None,
+            job.created,
+            job.updated,
+        )
+
+    @staticmethod
+    def __load(row: tuple) -> JobData:
+        id_, status, params, result, created, updated = row
+        return JobData(
+            id=id_,
+            status=status,
+            params=loads(params),
+            result=loads(result) if result else None,
+            created=created,
+            updated=updated,
+        )
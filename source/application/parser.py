@@ -0,0 +1,182 @@
+from asyncio import gather, get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from ..expansion import Converter, Namespace
+from ..translation import _, switch_language
+from .explore import Explore
+from .image import Image
+from .video import Video
+
+__all__ = ["NoteParser", "ParserPool"]
+
+
+class NoteParser:
+    """将作品页面 HTML 转换为作品数据，主进程与解析进程共用"""
+
+    def __init__(self):
+        self.convert = Converter()
+        self.explore = Explore()
+
+    def parse(self, html: str) -> Namespace:
+        return Namespace(self.convert.run(html))
+
+    def extract(self, namespace: Namespace, image_format: str) -> dict:
+        if not (data := self.explore.run(namespace)):
+            return {}
+        if data["作品类型"] == _("视频"):
+            data["下载地址"] = Video.get_video_link(namespace)
+            data["动图地址"] = [
+                None,
+            ]
+        elif data["作品类型"] == _("图文"):
+            data["下载地址"], data["动图地址"] = Image.get_image_link(
+                namespace, image_format
+            )
+        else:
+            data["下载地址"] = []
+        return data
+
+    def run(self, html: str, image_format: str) -> dict | None:
+        """返回提取后的作品数据，页面不包含作品数据时返回 None"""
+        if not (namespace := self.parse(html)):
+            return None
+        return self.extract(namespace, image_format)
+
+
+# 解析进程内的解析器实例，由进程初始化函数创建
+PARSER: NoteParser | None = None
+
+
+def initialize(language: str) -> None:
+    global PARSER
+    switch_language(language)
+    PARSER = NoteParser()
+
+
+def parse_page(html: str, image_format: str) -> dict | None:
+    return PARSER.run(html, image_format)
+
+
+class ParserPool:
+    """在独立进程中解析作品页面，进程之间只传递页面 HTML 与提取后的作品数据，避免解析阻塞事件循环"""
+
+    # 预热使用的最小页面，覆盖完整的解析流程
+    WARMUP = (
+        '<html><script>window.__INITIAL_STATE__={"note":{"noteDetailMap":'
+        '{"0":{"note":{"noteId":"0","type":"normal","imageList":[]}}}}}'
+        "</script></html>"
+    )
+
+    def __init__(self, workers: int, language: str):
+        self.size = workers
+        self.language = language
+        self.executor: ProcessPoolExecutor | None = None
+
+    async def start(self, warmup: bool = True) -> None:
+        # 使用 spawn 启动解析进程，避免复制事件循环与数据库线程的状态
+        self.executor = ProcessPoolExecutor(
+            self.size,
+            mp_context=get_context("spawn"),
+            initializer=initialize,
+            initargs=(self.language,),
+        )
+        if warmup:
+            await gather(*[self.run(self.WARMUP, "png") for _ in range(self.size)])
+
+    async def run(self, html: str, image_format: str) -> dict | None:
+        return await get_running_loop().run_in_executor(
+            self.executor,
+            parse_page,
+            html,
+            image_format,
+        )
+
+    def close(self) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+if __name__ == "__main__":
+    # 事件循环延迟对比，参数为保存到本地的作品页面 HTML 文件路径，未指定时使用模拟页面
+    # python -m source.application.parser page.html
+    from asyncio import run, sleep
+    from json import dumps
+    from pathlib import Path
+    from sys import argv
+    from time import perf_counter
+
+    PAGES = 64
+    TICK = 0.005
+
+    def sample_page() -> str:
+        images = [
+            {
+                "urlDefault": f"http://sns-webpic-qc.xhscdn.com/2024/{i:032x}/x!nd",
+                "infoList": [{"imageScene": "WB_DFT", "url": f"{i:064x}"}] * 8,
+            }
+            for i in range(400)
+        ]
+        note = {
+            "noteId": "0" * 24,
+            "type": "normal",
+            "title": "title",
+            "desc": "desc " * 20000,
+            "imageList": images,
+            "user": {"userId": "1" * 24, "nickname": "nickname"},
+            "interactInfo": {"likedCount": "1"},
+            "time": 1700000000000,
+            "lastUpdateTime": 1700000000000,
+        }
+        state = dumps({"note": {"noteDetailMap": {"0": {"note": note}}}})
+        # 页面中的 undefined 需要先替换为 null 再解码
+        state = state.replace('"likedCount": "1"', '"likedCount": undefined')
+        return f"<html><script>window.__INITIAL_STATE__={state}</script></html>"
+
+    async def measure(function, pages: list[str]) -> tuple[float, float]:
+        lag = 0.0
+        done = False
+
+        async def ticker():
+            nonlocal lag
+            loop = get_running_loop()
+            while not done:
+                start = loop.time()
+                await sleep(TICK)
+                lag = max(lag, loop.time() - start - TICK)
+
+        task = get_running_loop().create_task(ticker())
+        await sleep(TICK * 2)
+        start = perf_counter()
+        await gather(*[function(i) for i in pages])
+        elapsed = perf_counter() - start
+        done = True
+        await task
+        return lag, elapsed
+
+    async def main():
+        html = Path(argv[1]).read_text(encoding="utf-8") if argv[1:] else sample_page()
+        pages = [html] * PAGES
+        parser = NoteParser()
+
+        async def inline(page: str):
+            await sleep(0)
+            return parser.run(page, "png")
+
+        lag, elapsed = await measure(inline, pages)
+        print(
+            f"{len(html) / 1024:.0f} KB x {PAGES}, event loop: "
+            f"max lag {lag * 1000:.1f} ms, total {elapsed:.2f} s"
+        )
+        for workers in (1, 2, 4):
+            pool = ParserPool(workers, "zh_CN")
+            await pool.start()
+            lag, elapsed = await measure(lambda i: pool.run(i, "png"), pages)
+            pool.close()
+            print(
+                f"{len(html) / 1024:.0f} KB x {PAGES}, {workers} processes: "
+                f"max lag {lag * 1000:.1f} ms, total {elapsed:.2f} s"
+            )
+
+    run(main())
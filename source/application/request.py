@@ -1,9 +1,10 @@
+from time import monotonic
 from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
 from httpx import HTTPError
-from httpx import get
 
-from ..module import ERROR, Manager, logging, retry, sleep_time
+from ..module import ERROR, Manager, classify_error, logging, retry
 from ..translation import _
 
 if TYPE_CHECKING:
@@ -17,10 +18,14 @@ class Html:
         self,
         manager: "Manager",
     ):
-        self.retry = manager.retry
+        self.retry = manager.retry_policy
+        self.manager = manager
         self.client = manager.request_client
         self.headers = manager.headers
         self.timeout = manager.timeout
+        self.pacer = manager.pacer
+        self.limiter = manager.request_limiter
+        self.metrics = manager.metrics
 
     @retry
     async def request_url(
@@ -35,51 +40,93 @@ class Html:
         headers = self.update_cookie(
             cookie,
         )
-        try:
-            match (content, bool(proxy)):
-                case (True, False):
-                    response = await self.__request_url_get(
-                        url,
-                        headers,
-                        **kwargs,
-                    )
-                    await sleep_time()
-                    response.raise_for_status()
-                    return response.text
-                case (True, True):
-                    response = await self.__request_url_get_proxy(
+        await self.pacer.wait(url)
+        host = urlparse(url).hostname or ""
+        async with self.limiter:
+            start = monotonic()
+            try:
+                with self.metrics.timer("fetch", host=host):
+                    result = await self.__request_url(
                         url,
+                        content,
                         headers,
                         proxy,
                         **kwargs,
                     )
-                    await sleep_time()
-                    response.raise_for_status()
-                    return response.text
-                case (False, False):
-                    response = await self.__request_url_head(
-                        url,
-                        headers,
-                        **kwargs,
-                    )
-                    await sleep_time()
-                    return str(response.url)
-                case (False, True):
-                    response = await self.__request_url_head_proxy(
-                        url,
-                        headers,
-                        proxy,
-                        **kwargs,
-                    )
-                    await sleep_time()
-                    return str(response.url)
-                case _:
-                    raise ValueError
-        except HTTPError as error:
-            logging(
-                log, _("网络异常，{0} 请求失败: {1}").format(url, repr(error)), ERROR
+            except HTTPError as error:
+                self.limiter.feedback(error=error)
+                self.retry.record(error)
+                self.metrics.inc(
+                    "xhs_requests_total",
+                    stage="fetch",
+                    host=host,
+                    status=classify_error(error),
+                )
+                logging(
+                    log,
+                    _("网络异常，{0} 请求失败: {1}").format(url, repr(error)),
+                    ERROR,
+                )
+                return ""
+            self.limiter.feedback(monotonic() - start)
+            self.metrics.inc(
+                "xhs_requests_total", stage="fetch", host=host, status="ok"
             )
-            return ""
+            return result
+
+    async def __request_url(
+        self,
+        url: str,
+        content: bool,
+        headers: dict,
+        proxy: str = None,
+        **kwargs,
+    ) -> str:
+        match (content, bool(proxy)):
+            case (True, False):
+                response = await self.__request_url_get(
+                    url,
+                    headers,
+                    **kwargs,
+                )
+                response.raise_for_status()
+                self.__count_bytes(url, response)
+                return response.text
+            case (True, True):
+                response = await self.__request_url_get_proxy(
+                    url,
+                    headers,
+                    proxy,
+                    **kwargs,
+                )
+                response.raise_for_status()
+                self.__count_bytes(url, response)
+                return response.text
+            case (False, False):
+                response = await self.__request_url_head(
+                    url,
+                    headers,
+                    **kwargs,
+                )
+                return str(response.url)
+            case (False, True):
+                response = await self.__request_url_head_proxy(
+                    url,
+                    headers,
+                    proxy,
+                    **kwargs,
+                )
+                return str(response.url)
+            case _:
+                raise ValueError
+
+    def __count_bytes(self, url: str, response) -> None:
+        self.metrics.inc(
+            "xhs_bytes_total",
+            response.num_bytes_downloaded,
+            stage="fetch",
+            host=urlparse(url).hostname or "",
+        )
 
     @staticmethod
     def format_url(url: str) -> str:
@@ -110,13 +157,9 @@ class Html:
         proxy: str,
         **kwargs,
     ):
-        return await self.client.head(
+        return await self.manager.proxy_client(proxy).head(
             url,
             headers=headers,
-            proxy=proxy,
-            follow_redirects=True,
-            verify=False,
-            timeout=self.timeout,
             **kwargs,
         )
 
@@ -139,12 +182,8 @@ class Html:
         proxy: str,
         **kwargs,
     ):
-        return get(
+        return await self.manager.proxy_client(proxy).get(
             url,
             headers=headers,
-            proxy=proxy,
-            follow_redirects=True,
-            verify=False,
-            timeout=self.timeout,
             **kwargs,
         )
@@ -4,6 +4,7 @@ from .converter import Converter
 from .error import CacheError
 from .file_folder import file_switch
 from .file_folder import remove_empty_directories
+from .namespace import AttributeChain
 from .namespace import Namespace
 from .truncate import beautify_string
 from .truncate import trim_string
@@ -1,3 +1,5 @@
+from json import JSONDecodeError, JSONDecoder, loads
+from re import compile
 from typing import Union
 
 from lxml.etree import HTML
@@ -8,6 +10,13 @@ __all__ = ["Converter"]
 
 class Converter:
     INITIAL_STATE = "//script/text()"
+    PREFIX = "window.__INITIAL_STATE__="
+    SCRIPT_START = "<script"
+    SCRIPT_END = "</script>"
+    NOTE_DETAIL = '"noteDetailMap":'
+    DECODER = JSONDecoder()
+    # 匹配字符串字面量或 undefined，仅替换字符串之外的 undefined
+    UNDEFINED = compile(r'"(?:\\.|[^"\\])*"|\bundefined\b')
     KEYS_LINK = (
         "note",
         "noteDetailMap",
@@ -16,19 +25,85 @@ class Converter:
     )
 
     def run(self, content: str) -> dict:
-        return self._filter_object(self._convert_object(self._extract_object(content)))
+        script = self._extract_object(content)
+        return self._convert_note(script) or self._filter_object(
+            self._convert_object(script)
+        )
 
     def _extract_object(self, html: str) -> str:
         if not html:
             return ""
+        return self._scan_script(html) or self._parse_script(html)
+
+    @classmethod
+    def _scan_script(cls, html: str) -> str:
+        """直接在 HTML 文本中从后向前查找以 window.__INITIAL_STATE__ 开头的脚本"""
+        end = len(html)
+        while (start := html.rfind(cls.PREFIX, 0, end)) != -1:
+            end = start
+            if html[start - 1] != ">":
+                continue
+            tag = html.rfind(cls.SCRIPT_START, 0, start)
+            if tag == -1 or ">" in html[tag : start - 1]:
+                continue
+            if (close := html.find(cls.SCRIPT_END, start)) == -1:
+                return html[start:]
+            return html[start:close]
+        return ""
+
+    def _parse_script(self, html: str) -> str:
+        if self.PREFIX not in html:
+            return ""
         html_tree = HTML(html)
         scripts = html_tree.xpath(self.INITIAL_STATE)
         return self.get_script(scripts)
 
+    @classmethod
+    def _convert_note(cls, text: str) -> dict:
+        """仅解码 noteDetailMap 部分的数据，失败时返回空字典"""
+        if (start := text.find(cls.NOTE_DETAIL)) == -1:
+            return {}
+        try:
+            data = cls.__decode_value(text, start + len(cls.NOTE_DETAIL))
+        except (JSONDecodeError, RecursionError):
+            return {}
+        return cls.deep_get(data, cls.KEYS_LINK[2:]) or {}
+
+    @classmethod
+    def __decode_value(cls, text: str, start: int):
+        try:
+            return cls.DECODER.raw_decode(text, start)[0]
+        except JSONDecodeError:
+            text = cls.normalize_literal(text[start:].lstrip())
+            return cls.DECODER.raw_decode(text)[0]
+
+    @classmethod
+    def _convert_object(cls, text: str) -> dict:
+        try:
+            return cls._convert_json(text)
+        except (JSONDecodeError, RecursionError):
+            return cls._convert_yaml(text)
+
+    @classmethod
+    def _convert_json(cls, text: str) -> dict:
+        text = text.removeprefix(cls.PREFIX).rstrip("; \n")
+        return loads(cls.normalize_literal(text))
+
     @staticmethod
-    def _convert_object(text: str) -> dict:
+    def _convert_yaml(text: str) -> dict:
         return safe_load(text.lstrip("window.__INITIAL_STATE__="))
 
+    @classmethod
+    def normalize_literal(cls, text: str) -> str:
+        """将 JavaScript 对象字面量中的 undefined 替换为 JSON 支持的 null"""
+        if "undefined" not in text:
+            return text
+        return cls.UNDEFINED.sub(cls.__replace_undefined, text)
+
+    @staticmethod
+    def __replace_undefined(match) -> str:
+        return "null" if (value := match.group()) == "undefined" else value
+
     @classmethod
     def _filter_object(cls, data: dict) -> dict:
         return cls.deep_get(data, cls.KEYS_LINK) or {}
@@ -62,3 +137,36 @@ class Converter:
             if script.startswith("window.__INITIAL_STATE__"):
                 return script
         return ""
+
+
+if __name__ == "__main__":
+    # 解析耗时对比，参数为保存到本地的作品页面 HTML 文件路径
+    from pathlib import Path
+    from sys import argv
+    from timeit import timeit
+
+    demo = Converter()
+    for file in argv[1:]:
+        html = Path(file).read_text(encoding="utf-8")
+        script = demo._extract_object(html)
+        json_time = timeit(lambda: demo._convert_json(script), number=10) / 10
+        yaml_time = timeit(lambda: demo._convert_yaml(script), number=3) / 3
+        print(
+            f"{Path(file).name}: {len(script) / 1024:.1f} KB, "
+            f"JSON {json_time * 1000:.2f} ms, YAML {yaml_time * 1000:.2f} ms, "
+            f"{yaml_time / json_time:.1f}x"
+        )
+        scan_time = timeit(lambda: demo.run(html), number=10) / 10
+        tree_time = (
+            timeit(
+                lambda: demo._filter_object(
+                    demo._convert_yaml(demo._parse_script(html))
+                ),
+                number=3,
+            )
+            / 3
+        )
+        print(
+            f"{Path(file).name}: run {scan_time * 1000:.2f} ms, "
+            f"lxml + YAML {tree_time * 1000:.2f} ms"
+        )
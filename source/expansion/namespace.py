@@ -1,84 +1,82 @@
-from copy import deepcopy
-from types import SimpleNamespace
-from typing import Union
+from functools import lru_cache
+from typing import Any, Union
 
-__all__ = ["Namespace"]
+__all__ = ["Namespace", "AttributeChain"]
+
+
+class AttributeChain:
+    """预先解析的属性链，直接读取原始字典数据，不复制、不转换"""
+
+    __slots__ = ("chain", "steps")
+    INVALID = object()
+
+    def __init__(self, attribute_chain: str):
+        self.chain = attribute_chain
+        self.steps: tuple[tuple[str, Any], ...] = tuple(
+            self.__parse(i) for i in attribute_chain.split(".")
+        )
+
+    @classmethod
+    def __parse(cls, attribute: str) -> tuple[str, Any]:
+        if "[" in attribute:
+            attribute, index = attribute.split("[", 1)
+            try:
+                return attribute, int(index[:-1])
+            except ValueError:
+                return attribute, cls.INVALID
+        return attribute, None
+
+    def __call__(
+        self,
+        data: dict,
+        default: Union[str, int, list, dict] = "",
+    ) -> Any:
+        for attribute, index in self.steps:
+            data = data.get(attribute) if isinstance(data, dict) else None
+            if index is None:
+                if not data:
+                    return default
+            elif index is self.INVALID:
+                return default
+            else:
+                try:
+                    data = data[index]
+                except (IndexError, KeyError, TypeError):
+                    return default
+        return data or default
+
+    def __repr__(self):
+        return f"AttributeChain({self.chain!r})"
 
 
 class Namespace:
     def __init__(self, data: dict) -> None:
-        self.data: SimpleNamespace = self.generate_data_object(data)
+        self.data: dict = data or {}
 
     @staticmethod
-    def generate_data_object(data: dict) -> SimpleNamespace:
-        def depth_conversion(element):
-            if isinstance(element, dict):
-                return SimpleNamespace(
-                    **{k: depth_conversion(v) for k, v in element.items()}
-                )
-            elif isinstance(element, list):
-                return [depth_conversion(item) for item in element]
-            else:
-                return element
-
-        return depth_conversion(data)
+    @lru_cache(maxsize=256)
+    def compile(attribute_chain: str) -> AttributeChain:
+        return AttributeChain(attribute_chain)
 
     def safe_extract(
         self,
         attribute_chain: str,
-        default: Union[str, int, list, dict, SimpleNamespace] = "",
+        default: Union[str, int, list, dict] = "",
     ):
-        return self.__safe_extract(self.data, attribute_chain, default)
-
-    @staticmethod
-    def __safe_extract(
-        data_object: SimpleNamespace,
-        attribute_chain: str,
-        default: Union[str, int, list, dict, SimpleNamespace] = "",
-    ):
-        data = deepcopy(data_object)
-        attributes = attribute_chain.split(".")
-        for attribute in attributes:
-            if "[" in attribute:
-                parts = attribute.split("[", 1)
-                attribute = parts[0]
-                index = parts[1][:-1]
-                try:
-                    index = int(index)
-                    data = getattr(data, attribute, None)[index]
-                except (IndexError, TypeError, ValueError):
-                    return default
-            else:
-                data = getattr(data, attribute, None)
-                if not data:
-                    return default
-        return data or default
+        return self.compile(attribute_chain)(self.data, default)
 
     @classmethod
     def object_extract(
         cls,
-        data_object: SimpleNamespace,
+        data_object: dict,
         attribute_chain: str,
-        default: Union[str, int, list, dict, SimpleNamespace] = "",
+        default: Union[str, int, list, dict] = "",
     ):
-        return cls.__safe_extract(
-            data_object,
-            attribute_chain,
-            default,
-        )
+        return cls.compile(attribute_chain)(data_object, default)
 
     @property
     def __dict__(self):
-        return self.convert_to_dict(self.data)
-
-    @classmethod
-    def convert_to_dict(cls, data) -> dict:
-        return {
-            key: cls.convert_to_dict(value)
-            if isinstance(value, SimpleNamespace)
-            else value
-            for key, value in vars(data).items()
-        }
+        return self.data
 
     def __bool__(self):
-        return bool(vars(self.data))
+        return bool(self.data)
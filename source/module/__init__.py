@@ -1,13 +1,32 @@
+from .cache import NoteCache
+from .events import ProgressBus
 from .extend import Account
+from .flight import SingleFlight
 from .manager import Manager
 from .model import (
+    BatchParams,
+    ConcurrencyParams,
     ExtractData,
     ExtractParams,
+    JobData,
 )
+from .index import BloomFilter, FolderIndex, IDIndex
 from .recorder import DataRecorder
 from .recorder import IDRecorder
+from .recorder import JobRecorder
+from .recorder import LinkRecorder
 from .recorder import MapRecorder
+from .recorder import NoteRecorder
 from .mapping import Mapping
+from .metrics import Metrics
+from .pipeline import Pipeline
+from .pacer import BandwidthLimiter, HostPacer, TokenBucket
+from .scheduler import (
+    AdaptiveLimiter,
+    DownloadScheduler,
+    ResizableSemaphore,
+    create_limiter,
+)
 from .settings import Settings
 from .static import (
     VERSION_MAJOR,
@@ -34,6 +53,8 @@ from .static import (
     __VERSION__,
 )
 from .tools import (
+    RetryPolicy,
+    classify_error,
     retry,
     logging,
     sleep_time,
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from json import dumps, loads
+from time import time
+from typing import TYPE_CHECKING
+from zlib import compress, decompress
+
+if TYPE_CHECKING:
+    from .recorder import NoteRecorder
+
+__all__ = ["NoteCache"]
+
+
+class NoteCache:
+    """按作品 ID 缓存解析后的作品数据，内存 LRU 缓存未命中时读取磁盘缓存"""
+
+    MEMORY_SIZE = 256
+
+    def __init__(
+        self,
+        recorder: "NoteRecorder",
+        memory_size: int = MEMORY_SIZE,
+    ):
+        self.recorder = recorder
+        self.ttl = recorder.ttl
+        self.switch = recorder.switch
+        self.memory_size = memory_size
+        self.memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, id_: str) -> dict | None:
+        if not self.switch:
+            return None
+        if item := self.memory.get(id_):
+            if item[0] >= time() - self.ttl:
+                self.memory.move_to_end(id_)
+                self.memory_hits += 1
+                return item[1]
+            del self.memory[id_]
+        if row := await self.recorder.select(id_):
+            data = loads(decompress(row[0]))
+            self.__remember(id_, data, row[1])
+            self.disk_hits += 1
+            return data
+        self.misses += 1
+        return None
+
+    async def put(self, id_: str, data: dict) -> None:
+        if not self.switch or not data:
+            return
+        self.__remember(id_, data, time())
+        await self.recorder.add(
+            id_,
+            compress(dumps(data, ensure_ascii=False, separators=(",", ":")).encode()),
+        )
+
+    def __remember(self, id_: str, data: dict, timestamp: float) -> None:
+        self.memory[id_] = (timestamp, data)
+        self.memory.move_to_end(id_)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def status(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_items": len(self.memory),
+            "disk_bytes": self.recorder.size,
+        }
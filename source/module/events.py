@@ -0,0 +1,87 @@
+from asyncio import Queue, QueueEmpty, QueueFull
+from time import monotonic
+
+__all__ = ["ProgressBus"]
+
+
+class ProgressBus:
+    """文件下载进度事件总线，同一文件的进度事件按时间间隔节流，订阅者处理过慢时丢弃最早的事件"""
+
+    INTERVAL = 0.25
+    BUFFER = 256
+
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.transfers: dict[str, dict] = {}
+        self.subscribers: set[Queue] = set()
+
+    def start(
+        self,
+        key: str,
+        total: int | None,
+        completed: int = 0,
+    ) -> None:
+        now = monotonic()
+        self.transfers[key] = transfer = {
+            "name": key,
+            "total": total,
+            "completed": completed,
+            "started": now,
+            "published": now,
+        }
+        self.__publish("start", transfer)
+
+    def advance(self, key: str, amount: int) -> None:
+        if not (transfer := self.transfers.get(key)):
+            return
+        transfer["completed"] += amount
+        if (
+            self.subscribers
+            and (now := monotonic()) - transfer["published"] >= self.interval
+        ):
+            transfer["published"] = now
+            self.__publish("progress", transfer)
+
+    def finish(self, key: str, success: bool) -> None:
+        if transfer := self.transfers.pop(key, None):
+            self.__publish("finish", transfer, success=success)
+
+    def snapshot(self) -> list[dict]:
+        return [self.__event("progress", i) for i in self.transfers.values()]
+
+    async def subscribe(self):
+        """订阅进度事件，首先返回正在下载的文件的当前进度"""
+        queue = Queue(self.BUFFER)
+        self.subscribers.add(queue)
+        try:
+            for event in self.snapshot():
+                yield event
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers.discard(queue)
+
+    def __publish(self, type_: str, transfer: dict, **kwargs) -> None:
+        if not self.subscribers:
+            return
+        event = self.__event(type_, transfer) | kwargs
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except QueueFull:
+                try:
+                    queue.get_nowait()
+                except QueueEmpty:
+                    pass
+                queue.put_nowait(event)
+
+    @staticmethod
+    def __event(type_: str, transfer: dict) -> dict:
+        elapsed = monotonic() - transfer["started"]
+        return {
+            "type": type_,
+            "name": transfer["name"],
+            "total": transfer["total"],
+            "completed": transfer["completed"],
+            "elapsed": round(elapsed, 3),
+        }
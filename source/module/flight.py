@@ -0,0 +1,54 @@
+from asyncio import Task, create_task, shield
+from typing import Any, Awaitable, Callable, Hashable
+
+__all__ = ["SingleFlight"]
+
+
+class SingleFlight:
+    """合并相同键的并发调用，后到达的调用者等待正在执行的任务并共享其结果"""
+
+    def __init__(self):
+        self.calls: dict[Hashable, Task] = {}
+        self.waiters: dict[Task, int] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        function: Callable[..., Awaitable],
+        *args,
+        **kwargs,
+    ) -> Any:
+        if task := self.calls.get(key):
+            self.shared += 1
+        else:
+            self.executed += 1
+            task = self.calls[key] = create_task(function(*args, **kwargs))
+            task.add_done_callback(lambda _: self.__forget(key, task))
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            # 单个调用者被取消时不影响其他调用者
+            return await shield(task)
+        finally:
+            self.__leave(task)
+
+    def __leave(self, task: Task) -> None:
+        if count := self.waiters[task] - 1:
+            self.waiters[task] = count
+            return
+        del self.waiters[task]
+        # 全部调用者都已取消时取消共享的任务
+        if not task.done():
+            task.cancel()
+
+    def __forget(self, key: Hashable, task: Task) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def status(self) -> dict:
+        return {
+            "in_flight": len(self.calls),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
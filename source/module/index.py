@@ -0,0 +1,217 @@
+from asyncio import to_thread
+from os import scandir
+from pathlib import Path
+from re import compile
+from sqlite3 import connect
+from time import monotonic
+
+__all__ = ["BloomFilter", "IDIndex", "FolderIndex"]
+
+
+class BloomFilter:
+    """进程内使用的分块布隆过滤器，每个键基于 hash() 在同一个字节内设置 3 个比特，不支持删除"""
+
+    BYTES_PER_ITEM = 2
+    # 恰好设置 3 个比特的全部 56 种字节取值
+    PATTERNS = tuple(i for i in range(256) if i.bit_count() == 3)
+
+    def __init__(self, capacity: int):
+        size = 1 << max(capacity * self.BYTES_PER_ITEM, 1 << 17).bit_length()
+        self.mask = size - 1
+        self.bits = bytearray(size)
+
+    def add(self, key: str) -> None:
+        h = hash(key)
+        self.bits[h & self.mask] |= self.PATTERNS[(h >> 40) % 56]
+
+    def update(self, keys) -> None:
+        bits, mask, patterns = self.bits, self.mask, self.PATTERNS
+        for key in keys:
+            h = hash(key)
+            bits[h & mask] |= patterns[(h >> 40) % 56]
+
+    def __contains__(self, key: str) -> bool:
+        h = hash(key)
+        pattern = self.PATTERNS[(h >> 40) % 56]
+        return self.bits[h & self.mask] & pattern == pattern
+
+
+class IDIndex:
+    """作品 ID 内存索引：布隆过滤器快速排除未下载的作品，有序数组精确确认已下载的作品"""
+
+    # 作品 ID 为 24 位十六进制字符串，按 12 字节定长存储
+    WIDTH = 12
+    HEX_ID = compile(r"[0-9a-f]{24}")
+    HEX_TEXT = compile(r"[0-9a-f]*")
+    CHUNK = 65536
+
+    def __init__(self, capacity: int = 0):
+        self.bloom = BloomFilter(capacity)
+        self.array = b""
+        self.length = 0
+        self.extra: set[str] = set()
+        self.removed: set[str] = set()
+
+    @classmethod
+    def build(cls, file, table: str = "explore_id") -> "IDIndex":
+        """从数据库读取全部作品 ID 构建索引，耗时操作，应在线程中调用"""
+        with connect(file) as database:
+            (count,) = database.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            index = cls(count)
+            # 主键索引保证结果有序，十六进制 ID 的字符串顺序与字节顺序一致
+            cursor = database.execute(f"SELECT ID FROM {table} ORDER BY ID")
+            chunks = []
+            while rows := cursor.fetchmany(cls.CHUNK):
+                chunks.append(index.__load(rows))
+        index.array = b"".join(chunks)
+        index.length = len(index.array) // cls.WIDTH
+        return index
+
+    def __load(self, rows: list[tuple[str]]) -> bytes:
+        ids = [i for (i,) in rows]
+        self.bloom.update(ids)
+        text = "".join(ids)
+        if set(map(len, ids)) == {self.WIDTH * 2} and self.HEX_TEXT.fullmatch(text):
+            return bytes.fromhex(text)
+        # 存在非标准格式的作品 ID 时逐个检查
+        chunk = []
+        for id_ in ids:
+            if self.HEX_ID.fullmatch(id_):
+                chunk.append(id_)
+            else:
+                self.extra.add(id_)
+        return bytes.fromhex("".join(chunk))
+
+    def add(self, id_: str) -> None:
+        self.bloom.add(id_)
+        self.removed.discard(id_)
+        if not self.__search(id_):
+            self.extra.add(id_)
+
+    def discard(self, id_: str) -> None:
+        if id_ in self.extra:
+            self.extra.remove(id_)
+        elif self.__search(id_):
+            self.removed.add(id_)
+
+    def __contains__(self, id_: str) -> bool:
+        if id_ not in self.bloom or id_ in self.removed:
+            return False
+        return id_ in self.extra or self.__search(id_)
+
+    def __search(self, id_: str) -> bool:
+        if not self.HEX_ID.fullmatch(id_):
+            return False
+        key = bytes.fromhex(id_)
+        array, width = self.array, self.WIDTH
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) >> 1
+            start = middle * width
+            value = array[start : start + width]
+            if value < key:
+                low = middle + 1
+            elif value > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.length + len(self.extra) - len(self.removed)
+
+
+class FolderIndex:
+    """文件夹文件名内存索引：每个文件夹只读取一次目录，之后在内存中判断文件是否存在"""
+
+    # 长时间运行时定期重新读取目录，发现程序外部删除或添加的文件
+    TTL = 300
+
+    def __init__(self, ttl: float = TTL):
+        self.ttl = ttl
+        self.folders: dict[Path, tuple[float, set[str]]] = {}
+
+    async def load(self, *folders: Path) -> None:
+        """在线程中读取尚未加载或已过期的文件夹"""
+        if expired := [i for i in folders if self.__expired(i)]:
+            for folder, names in zip(
+                expired,
+                await to_thread(lambda: [self.__scan(i) for i in expired]),
+            ):
+                self.folders[folder] = (monotonic(), names)
+
+    def exists(self, folder: Path, name: str) -> bool:
+        """只读取内存索引，过期的文件夹由 load() 在线程中重新读取"""
+        if cache := self.folders.get(folder):
+            return name in cache[1]
+        # 尚未加载的文件夹只检查单个文件，不在事件循环中读取整个目录
+        return folder.joinpath(name).exists()
+
+    def add(self, file: Path) -> None:
+        if cache := self.folders.get(file.parent):
+            cache[1].add(file.name)
+
+    def discard(self, file: Path) -> None:
+        if cache := self.folders.get(file.parent):
+            cache[1].discard(file.name)
+
+    def clear(self) -> None:
+        self.folders.clear()
+
+    def __expired(self, folder: Path) -> bool:
+        return (
+            not (cache := self.folders.get(folder)) or monotonic() - cache[0] > self.ttl
+        )
+
+    @staticmethod
+    def __scan(folder: Path) -> set[str]:
+        try:
+            with scandir(folder) as entries:
+                return {i.name for i in entries}
+        except (FileNotFoundError, NotADirectoryError):
+            return set()
+
+
+if __name__ == "__main__":
+    # 启动耗时对比，参数为模拟的下载记录数量，默认 5000000
+    # python -m source.module.index 5000000
+    from os import urandom
+    from pathlib import Path
+    from sys import argv
+    from tempfile import TemporaryDirectory
+    from time import perf_counter
+    from timeit import timeit
+
+    total = int(argv[1]) if len(argv) > 1 else 5_000_000
+    with TemporaryDirectory() as folder:
+        file = Path(folder).joinpath("ExploreID.db")
+        with connect(file) as db:
+            db.execute("CREATE TABLE explore_id (ID TEXT PRIMARY KEY);")
+            for _ in range(0, total, 100_000):
+                db.executemany(
+                    "INSERT OR IGNORE INTO explore_id VALUES (?);",
+                    ((urandom(12).hex(),) for _ in range(min(100_000, total))),
+                )
+            ids = [i for (i,) in db.execute("SELECT ID FROM explore_id LIMIT 1000")]
+        start = perf_counter()
+        demo = IDIndex.build(file)
+        elapsed = perf_counter() - start
+        memory = (len(demo.array) + len(demo.bloom.bits)) / 1024 / 1024
+        print(f"{len(demo)} IDs: build {elapsed:.2f} s, array + bloom {memory:.1f} MiB")
+        missing = [urandom(12).hex() for _ in range(1000)]
+        assert all(i in demo for i in ids) and not any(i in demo for i in missing)
+        with connect(file) as db:
+
+            def select():
+                for i in ids + missing:
+                    db.execute("SELECT ID FROM explore_id WHERE ID=?", (i,)).fetchone()
+
+            def lookup():
+                for i in ids + missing:
+                    _ = i in demo
+
+            sql_time = timeit(select, number=5) / 5 / 2000
+            index_time = timeit(lookup, number=5) / 5 / 2000
+        print(
+            f"lookup: SQLite {sql_time * 1e6:.2f} µs, index {index_time * 1e6:.2f} µs"
+        )
@@ -1,11 +1,14 @@
+from importlib.util import find_spec
 from pathlib import Path
 from re import compile, sub
 from shutil import move, rmtree
 from os import utime
 from httpx import (
+    AsyncBaseTransport,
     AsyncClient,
     AsyncHTTPTransport,
     HTTPStatusError,
+    Limits,
     RequestError,
     TimeoutException,
     get,
@@ -14,12 +17,30 @@ from httpx import (
 from source.expansion import remove_empty_directories
 
 from ..translation import _
-from .static import HEADERS, USERAGENT, WARNING
-from .tools import logging
+from .events import ProgressBus
+from .flight import SingleFlight
+from .metrics import Metrics
+from .pacer import BandwidthLimiter, HostPacer
+from .scheduler import DownloadScheduler, create_limiter
+from .static import HEADERS, MAX_WORKERS, USERAGENT, WARNING
+from .tools import RetryPolicy, logging
 
 __all__ = ["Manager"]
 
 
+class SharedTransport(AsyncBaseTransport):
+    """多个客户端共用的连接池，关闭客户端时不关闭连接池，由 Manager 统一关闭"""
+
+    def __init__(self, transport: AsyncHTTPTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
 class Manager:
     NAME = compile(r"[^\u4e00-\u9fffa-zA-Z0-9-_！？，。；：“”（）《》]")
     NAME_KEYS = (
@@ -41,6 +62,10 @@ class Manager:
         "http://": None,
         "https://": None,
     }
+    CDN_HOSTS = (
+        "https://*.xhscdn.com",
+        "https://ci.xiaohongshu.com",
+    )
     SEPARATE = "_"
     WEB_ID = r"(?:^|; )webId=[^;]+"
     WEB_SESSION = r"(?:^|; )web_session=[^;]+"
@@ -67,6 +92,25 @@ class Manager:
         author_archive: bool,
         write_mtime: bool,
         markdown_record: bool,
+        concurrency: int,
+        request_rate: float,
+        segment_threshold: int,
+        segment_count: int,
+        image_concurrency: int,
+        video_concurrency: int,
+        live_concurrency: int,
+        adaptive_concurrency: bool,
+        max_connections: int,
+        max_keepalive_connections: int,
+        http2: bool,
+        link_cache_ttl: int,
+        note_cache_ttl: int,
+        note_cache_size: int,
+        job_workers: int,
+        parse_workers: int,
+        parse_warmup: bool,
+        download_rate: float,
+        bandwidth_limit: int,
         _print: bool,
     ):
         self.root = root
@@ -80,6 +124,7 @@ class Manager:
             "cookie": cookie,
         }
         self.retry = retry
+        self.retry_policy = RetryPolicy(retry)
         self.chunk = chunk
         self.name_format = self.__check_name_format(name_format)
         self.record_data = self.check_bool(record_data, False)
@@ -87,12 +132,52 @@ class Manager:
         self.folder_mode = self.check_bool(folder_mode, False)
         self.download_record = self.check_bool(download_record, True)
         self.markdown_record = self.check_bool(markdown_record, False)
+        self.link_cache_ttl = self.check_number(link_cache_ttl, 12, 0)
+        self.note_cache_ttl = self.check_number(note_cache_ttl, 300, 0)
+        self.note_cache_size = self.check_number(note_cache_size, 256, 0)
+        self.job_workers = self.check_number(job_workers, 2, 1)
+        self.parse_workers = self.check_number(parse_workers, 0, 0)
+        self.parse_warmup = self.check_bool(parse_warmup, True)
+        self.concurrency = self.check_number(concurrency, 4, 1)
+        self.request_rate = self.check_number(request_rate, 2.0, 0)
+        self.pacer = HostPacer(self.request_rate, self.concurrency)
+        self.download_rate = self.check_number(download_rate, 2.0, 0)
+        # 下载文件按 CDN 主机保持最小请求间隔，等待时不占用下载并发数量
+        self.download_pacer = HostPacer(self.download_rate)
+        self.bandwidth_limit = self.check_number(bandwidth_limit, 0, 0)
+        self.bandwidth = BandwidthLimiter(self.bandwidth_limit)
+        self.flight = SingleFlight()
+        self.progress = ProgressBus()
+        self.metrics = Metrics()
+        self.segment_threshold = self.check_number(segment_threshold, 16 * 1024**2, 0)
+        self.segment_count = self.check_number(segment_count, 4, 1)
+        self.adaptive_concurrency = self.check_bool(adaptive_concurrency, False)
+        self.request_limiter = create_limiter(
+            self.concurrency,
+            self.adaptive_concurrency,
+        )
+        self.scheduler = DownloadScheduler(
+            self.check_number(image_concurrency, MAX_WORKERS, 1),
+            self.check_number(video_concurrency, 2, 1),
+            self.check_number(live_concurrency, 2, 1),
+            self.adaptive_concurrency,
+        )
         self.proxy_tip = None
         self.proxy = self.__check_proxy(proxy)
         self.print_proxy_tip(
             _print,
         )
         self.timeout = timeout
+        self.limits = Limits(
+            max_connections=self.check_number(max_connections, 100, 1),
+            max_keepalive_connections=self.check_number(
+                max_keepalive_connections, 20, 0
+            ),
+        )
+        self.http2 = self.__check_http2(http2, _print)
+        self.transports: list[AsyncHTTPTransport] = []
+        self.mounts = self.__create_mounts(self.proxy)
+        self.metrics.collector(self.collect_metrics)
         self.request_client = AsyncClient(
             headers=self.headers
             | {
@@ -101,27 +186,69 @@ class Manager:
             timeout=timeout,
             verify=False,
             follow_redirects=True,
-            mounts={
-                "http://": AsyncHTTPTransport(proxy=self.proxy),
-                "https://": AsyncHTTPTransport(proxy=self.proxy),
-            },
+            mounts=self.mounts,
         )
         self.download_client = AsyncClient(
             headers=self.blank_headers,
             timeout=timeout,
             verify=False,
             follow_redirects=True,
-            mounts={
-                "http://": AsyncHTTPTransport(proxy=self.proxy),
-                "https://": AsyncHTTPTransport(proxy=self.proxy),
-            },
+            mounts=self.mounts,
         )
+        self.proxy_clients: dict[str, AsyncClient] = {}
         self.image_download = self.check_bool(image_download, True)
         self.video_download = self.check_bool(video_download, True)
         self.live_download = self.check_bool(live_download, True)
         self.author_archive = self.check_bool(author_archive, False)
         self.write_mtime = self.check_bool(write_mtime, False)
 
+    def __create_mounts(self, proxy: str | None) -> dict[str, SharedTransport]:
+        """请求客户端与下载客户端共用的连接池，开启 HTTP/2 时 CDN 主机使用独立的 HTTP/2 连接池"""
+        transport = self.__create_transport(proxy)
+        mounts = {
+            "http://": transport,
+            "https://": transport,
+        }
+        if self.http2:
+            cdn = self.__create_transport(proxy, True)
+            mounts |= dict.fromkeys(self.CDN_HOSTS, cdn)
+        return mounts
+
+    def __create_transport(self, proxy: str | None, http2=False) -> SharedTransport:
+        transport = AsyncHTTPTransport(
+            proxy=proxy,
+            limits=self.limits,
+            http2=http2,
+        )
+        # 连接池在全部客户端关闭后由 close() 关闭一次
+        self.transports.append(transport)
+        return SharedTransport(transport)
+
+    def proxy_client(self, proxy: str) -> AsyncClient:
+        """按代理地址缓存异步客户端，避免每次请求建立新连接"""
+        if not (client := self.proxy_clients.get(proxy)):
+            client = self.proxy_clients[proxy] = AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                verify=False,
+                follow_redirects=True,
+                mounts=self.__create_mounts(proxy),
+            )
+        return client
+
+    def __check_http2(self, http2: bool, _print: bool) -> bool:
+        if not self.check_bool(http2, False):
+            return False
+        if find_spec("h2"):
+            return True
+        if _print:
+            logging(
+                None,
+                _("未安装 h2 模块，无法启用 HTTP/2，请运行 pip install httpx[http2]"),
+                WARNING,
+            )
+        return False
+
     def __check_path(self, path: str) -> Path:
         if not path:
             return self.root
@@ -195,9 +322,45 @@ class Manager:
     def check_bool(value: bool, default: bool) -> bool:
         return value if isinstance(value, bool) else default
 
+    @staticmethod
+    def check_number(
+        value: int | float,
+        default: int | float,
+        minimum: int | float = 0,
+    ) -> int | float:
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            return default
+        return value if value >= minimum else default
+
+    def collect_metrics(self):
+        """重试次数、错误分类、并发限制器与合并请求的即时指标"""
+        policy = self.retry_policy
+        for class_, count in policy.retries.items():
+            yield "xhs_retries_total", {"class": class_}, count
+        for class_, count in policy.failures.items():
+            yield "xhs_failures_total", {"class": class_}, count
+        yield "xhs_retry_exhausted_total", {}, policy.exhausted
+        limiters = {"request": self.request_limiter} | self.scheduler.slots
+        for name, limiter in limiters.items():
+            labels = {"limiter": name}
+            yield "xhs_limiter_limit", labels, limiter.limit
+            yield "xhs_limiter_active", labels, limiter.active
+            yield "xhs_limiter_waiting", labels, limiter.waiting
+            yield "xhs_limiter_saturation", labels, limiter.active / limiter.limit
+        flight = self.flight.status()
+        yield "xhs_single_flight_total", {"result": "executed"}, flight["executed"]
+        yield "xhs_single_flight_total", {"result": "shared"}, flight["shared"]
+        yield "xhs_queue_depth", {"queue": "single_flight"}, flight["in_flight"]
+
     async def close(self):
         await self.request_client.aclose()
         await self.download_client.aclose()
+        for client in self.proxy_clients.values():
+            await client.aclose()
+        self.proxy_clients.clear()
+        for transport in self.transports:
+            await transport.aclose()
+        self.transports.clear()
         # self.__clean()
         remove_empty_directories(self.root)
         remove_empty_directories(self.folder)
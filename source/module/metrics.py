@@ -0,0 +1,126 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from time import monotonic
+from typing import Callable, Iterable
+
+__all__ = ["Metrics"]
+
+Sample = tuple[str, dict, float]
+
+
+class Metrics:
+    """进程内指标记录，按 Prometheus 文本格式输出计数器、直方图与即时取值的指标"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    # 指标名称、类型、说明
+    DESCRIPTIONS = {
+        "xhs_requests_total": ("counter", "HTTP requests by stage, host and status"),
+        "xhs_bytes_total": ("counter", "Bytes received by stage and host"),
+        "xhs_stage_seconds": ("histogram", "Latency of each processing stage"),
+        "xhs_records_total": ("counter", "Rows written to SQLite by table"),
+        "xhs_retries_total": ("counter", "Retries by error class"),
+        "xhs_failures_total": ("counter", "Failed attempts by error class"),
+        "xhs_retry_exhausted_total": ("counter", "Retries refused by the retry budget"),
+        "xhs_limiter_limit": ("gauge", "Current concurrency limit"),
+        "xhs_limiter_active": ("gauge", "Slots currently in use"),
+        "xhs_limiter_waiting": ("gauge", "Tasks waiting for a slot"),
+        "xhs_limiter_saturation": ("gauge", "Slots in use divided by the limit"),
+        "xhs_queue_depth": ("gauge", "Items waiting in a queue"),
+        "xhs_cache_total": ("counter", "Note cache lookups by result"),
+        "xhs_single_flight_total": ("counter", "Coalesced calls by result"),
+    }
+
+    def __init__(self):
+        self.counters: dict[tuple, float] = defaultdict(float)
+        self.histograms: dict[tuple, list] = {}
+        self.collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    @staticmethod
+    def __key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        self.counters[self.__key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        if not (histogram := self.histograms.get(key := self.__key(name, labels))):
+            histogram = self.histograms[key] = [[0] * (len(self.BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect_left(self.BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.observe(
+                "xhs_stage_seconds", monotonic() - start, stage=stage, **labels
+            )
+
+    def collector(self, function: Callable[[], Iterable[Sample]]) -> None:
+        """注册在输出指标时调用的函数，返回 (名称, 标签, 取值) 序列"""
+        self.collectors.append(function)
+
+    def collect(self) -> dict[str, list[tuple[dict, float]]]:
+        samples = defaultdict(list)
+        for (name, labels), value in self.counters.items():
+            samples[name].append((dict(labels), value))
+        for function in self.collectors:
+            for name, labels, value in function():
+                samples[name].append((labels, value))
+        return samples
+
+    def render(self) -> str:
+        lines = []
+        for name, values in sorted(self.collect().items()):
+            self.__describe(lines, name)
+            lines.extend(
+                f"{name}{self.__labels(labels)} {value:g}" for labels, value in values
+            )
+        histograms = defaultdict(list)
+        for (name, labels), value in self.histograms.items():
+            histograms[name].append((dict(labels), value))
+        for name, values in sorted(histograms.items()):
+            self.__describe(lines, name)
+            for labels, (buckets, total, count) in values:
+                cumulative = 0
+                for bound, number in zip((*self.BUCKETS, "+Inf"), buckets):
+                    cumulative += number
+                    lines.append(
+                        f"{name}_bucket{self.__labels(labels | {'le': bound})} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{self.__labels(labels)} {total:g}")
+                lines.append(f"{name}_count{self.__labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def __describe(self, lines: list[str], name: str) -> None:
+        type_, help_ = self.DESCRIPTIONS.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} {type_}")
+
+    @staticmethod
+    def __labels(labels: dict) -> str:
+        if not labels:
+            return ""
+        values = ",".join(f'{k}="{Metrics.__escape(v)}"' for k, v in labels.items())
+        return f"{{{values}}}"
+
+    @staticmethod
+    def __escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def summary(self) -> list[tuple[str, int, float, float]]:
+        """按处理阶段汇总耗时：阶段、次数、总耗时、平均耗时"""
+        stages = defaultdict(lambda: [0, 0.0])
+        for (name, labels), (_, total, count) in self.histograms.items():
+            if name == "xhs_stage_seconds":
+                stage = stages[dict(labels)["stage"]]
+                stage[0] += count
+                stage[1] += total
+        return [
+            (stage, count, total, total / count if count else 0.0)
+            for stage, (count, total) in stages.items()
+        ]
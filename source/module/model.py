@@ -4,13 +4,35 @@ from pydantic import BaseModel
 class ExtractParams(BaseModel):
     url: str
     download: bool = False
-    index: list = None
-    cookie: str = None
-    proxy: str = None
+    index: list | None = None
+    cookie: str | None = None
+    proxy: str | None = None
     skip: bool = False
+    bandwidth_limit: int | None = None
+
+
+class BatchParams(BaseModel):
+    items: list[ExtractParams]
 
 
 class ExtractData(BaseModel):
     message: str
     params: ExtractParams
     data: dict | None
+
+
+class ConcurrencyParams(BaseModel):
+    image: int = None
+    video: int = None
+    live: int = None
+    download_rate: float = None
+    bandwidth_limit: int = None
+
+
+class JobData(BaseModel):
+    id: str
+    status: str
+    params: ExtractParams
+    result: ExtractData | None = None
+    created: float
+    updated: float
@@ -0,0 +1,124 @@
+from asyncio import sleep
+from time import monotonic
+from urllib.parse import urlparse
+
+__all__ = ["TokenBucket", "HostPacer", "BandwidthLimiter"]
+
+
+class TokenBucket:
+    """令牌桶，令牌不足时预支并等待，保证等待者按到达顺序获得令牌"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.timestamp = monotonic()
+
+    def update(
+        self,
+        rate: float,
+        capacity: float = None,
+    ) -> None:
+        self.__refill()
+        self.rate = rate
+        if capacity is not None:
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def reserve(self, amount: float = 1) -> float:
+        """预支令牌，返回需要等待的秒数"""
+        if self.rate <= 0:
+            return 0
+        self.__refill()
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    async def acquire(self, amount: float = 1) -> None:
+        if delay := self.reserve(amount):
+            await sleep(delay)
+
+    def __refill(self) -> None:
+        now = monotonic()
+        if self.rate > 0:
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.timestamp) * self.rate,
+            )
+        self.timestamp = now
+
+
+class HostPacer:
+    """按主机限制请求频率，rate 为每秒请求次数，小于等于 0 表示不限制"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.buckets: dict[str, TokenBucket] = {}
+
+    def update(
+        self,
+        rate: float,
+        burst: int = None,
+    ) -> None:
+        self.rate = rate
+        if burst is not None:
+            self.burst = max(burst, 1)
+        for bucket in self.buckets.values():
+            bucket.update(self.rate, self.burst)
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname or ""
+        if not (bucket := self.buckets.get(host)):
+            bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def wait(self, url: str) -> None:
+        if self.rate > 0:
+            await self.bucket(url).acquire()
+
+
+class BandwidthLimiter:
+    """下载带宽限制，rate 单位为字节/秒，小于等于 0 表示不限制，同时下载的文件按到达顺序分配令牌"""
+
+    MIN_CHUNK = 16 * 1024
+
+    def __init__(
+        self,
+        rate: int,
+        parent: "BandwidthLimiter" = None,
+    ):
+        self.rate = rate
+        self.parent = parent
+        self.bucket = TokenBucket(rate, rate)
+
+    def update(self, rate: int) -> None:
+        self.rate = rate
+        self.bucket.update(rate, rate)
+
+    def child(self, rate: int) -> "BandwidthLimiter":
+        """创建单次运行使用的带宽限制"""
+        return BandwidthLimiter(rate, self)
+
+    def chunk(self, size: int) -> int:
+        """限制带宽时缩小读取数据块，使等待时间更平滑"""
+        if rates := [i.rate for i in self.__chain() if i.rate > 0]:
+            return min(size, max(min(rates) // 8, self.MIN_CHUNK))
+        return size
+
+    async def consume(self, amount: int) -> None:
+        if delay := max(i.bucket.reserve(amount) for i in self.__chain()):
+            await sleep(delay)
+
+    def __chain(self):
+        limiter = self
+        while limiter:
+            yield limiter
+            limiter = limiter.parent
@@ -0,0 +1,77 @@
+from asyncio import (
+    FIRST_COMPLETED,
+    Future,
+    Queue,
+    create_task,
+    gather,
+    get_running_loop,
+    wait,
+)
+from typing import Awaitable, Callable, Iterable
+
+__all__ = ["Pipeline"]
+
+Handler = Callable[[dict], Awaitable[bool]]
+
+
+class Pipeline:
+    """多阶段流水线：相邻阶段之间使用有界队列连接，各阶段分别设置并发数量，下游处理缓慢时阻塞上游"""
+
+    def __init__(self):
+        self.stages: list[tuple[str, Handler, int]] = []
+
+    def stage(self, name: str, handler: Handler, workers: int = 1) -> "Pipeline":
+        """添加处理阶段，处理函数返回假值时该项目不再进入后续阶段"""
+        self.stages.append((name, handler, max(workers, 1)))
+        return self
+
+    async def run(self, items: Iterable[dict]) -> list[dict]:
+        """按输入顺序返回全部项目，任意阶段抛出异常时停止处理并抛出该异常"""
+        # 队列长度与阶段并发数量相同，同时存在的项目数量与输入数量无关
+        queues = [Queue(workers) for _, _, workers in self.stages]
+        failure = get_running_loop().create_future()
+        workers = [
+            create_task(self.__work(handler, queues, index, failure))
+            for index, (_, handler, count) in enumerate(self.stages)
+            for _ in range(count)
+        ]
+        result = []
+        feed = create_task(self.__feed(items, queues, result))
+        try:
+            await wait((feed, failure), return_when=FIRST_COMPLETED)
+        finally:
+            for task in (feed, *workers):
+                task.cancel()
+            await gather(feed, *workers, return_exceptions=True)
+        if failure.done():
+            failure.result()
+        return result
+
+    @staticmethod
+    async def __feed(items: Iterable[dict], queues: list[Queue], result: list) -> None:
+        for item in items:
+            result.append(item)
+            await queues[0].put(item)
+        for queue in queues:
+            await queue.join()
+
+    @staticmethod
+    async def __work(
+        handler: Handler,
+        queues: list[Queue],
+        index: int,
+        failure: Future,
+    ) -> None:
+        queue = queues[index]
+        downstream = queues[index + 1] if index + 1 < len(queues) else None
+        while True:
+            item = await queue.get()
+            try:
+                if await handler(item) and downstream:
+                    await downstream.put(item)
+            except Exception as error:
+                if not failure.done():
+                    failure.set_exception(error)
+                raise
+            finally:
+                queue.task_done()
@@ -1,34 +1,130 @@
-from asyncio import CancelledError
+from asyncio import (
+    CancelledError,
+    Lock,
+    Task,
+    create_task,
+    shield,
+    sleep,
+    to_thread,
+)
 from contextlib import suppress
-from typing import TYPE_CHECKING
+from itertools import groupby
+from operator import itemgetter
+from time import time
+from typing import TYPE_CHECKING, Any
 
 from aiosqlite import connect
 
+from ..translation import _
+from .index import IDIndex
+from .static import ERROR
+from .tools import logging
+
 if TYPE_CHECKING:
     from ..module import Manager
 
-__all__ = ["IDRecorder", "DataRecorder", "MapRecorder"]
+__all__ = [
+    "IDRecorder",
+    "DataRecorder",
+    "MapRecorder",
+    "LinkRecorder",
+    "NoteRecorder",
+    "JobRecorder",
+]
 
 
 class IDRecorder:
+    # 缓冲区写入数量或等待时间达到阈值时批量提交
+    BATCH_SIZE = 128
+    FLUSH_INTERVAL = 2.0
+    # 单条 SQL 语句的参数数量上限
+    MAX_VARIABLES = 900
+    UNSET = object()
+
     def __init__(self, manager: "Manager"):
         self.file = manager.root.joinpath("ExploreID.db")
         self.switch = manager.download_record
         self.database = None
         self.cursor = None
+        self.buffer: list[tuple[str, tuple, str | None]] = []
+        self.pending: dict[str, Any] = {}
+        self.lock = Lock()
+        self.timer: Task | None = None
+        self.index: IDIndex | None = None
+        self.index_task: Task | None = None
+        # 索引构建期间的写入，构建完成后补充到索引，True 表示添加，False 表示删除
+        self.changes: dict[str, bool] = {}
+        self.metrics = manager.metrics
 
     async def _connect_database(self):
         self.database = await connect(self.file)
+        await self._tune_database()
         self.cursor = await self.database.cursor()
         await self.database.execute(
             "CREATE TABLE IF NOT EXISTS explore_id (ID TEXT PRIMARY KEY);"
         )
         await self.database.commit()
+        if self.switch:
+            # 后台构建索引，构建完成前使用数据库查询
+            self.index_task = create_task(self.__build_index())
+
+    async def __build_index(self) -> None:
+        try:
+            index = await to_thread(IDIndex.build, self.file)
+        except CancelledError:
+            raise
+        except Exception as error:
+            logging(None, _("构建作品 ID 索引失败：{0}").format(repr(error)), ERROR)
+            return
+        finally:
+            changes, self.changes = self.changes, {}
+        for id_, added in changes.items():
+            if added:
+                index.add(id_)
+            else:
+                index.discard(id_)
+        self.index = index
+
+    def __update_index(self, id_: str, added: bool) -> None:
+        if self.index is not None:
+            if added:
+                self.index.add(id_)
+            else:
+                self.index.discard(id_)
+        elif self.index_task and not self.index_task.done():
+            self.changes[id_] = added
+
+    async def _tune_database(self):
+        await self.database.execute("PRAGMA journal_mode=WAL;")
+        await self.database.execute("PRAGMA synchronous=NORMAL;")
 
     async def select(self, id_: str):
         if self.switch:
-            await self.cursor.execute("SELECT ID FROM explore_id WHERE ID=?", (id_,))
-            return await self.cursor.fetchone()
+            if self.index is not None:
+                return (id_,) if id_ in self.index else None
+            if (row := self.pending.get(id_, self.UNSET)) is not self.UNSET:
+                return row
+            async with self.database.execute(
+                "SELECT ID FROM explore_id WHERE ID=?", (id_,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def select_many(self, ids: list[str]) -> set[str]:
+        """批量查询存在下载记录的作品 ID"""
+        if not self.switch:
+            return set()
+        if self.index is not None:
+            return {i for i in ids if i in self.index}
+        await self.flush()
+        result = set()
+        for start in range(0, len(ids), self.MAX_VARIABLES):
+            chunk = ids[start : start + self.MAX_VARIABLES]
+            async with self.database.execute(
+                f"SELECT ID FROM explore_id WHERE ID IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ) as cursor:
+                result.update(i[0] for i in await cursor.fetchall())
+        return result
 
     async def add(
         self,
@@ -38,31 +134,106 @@ class IDRecorder:
         **kwargs,
     ) -> None:
         if self.switch:
-            await self.database.execute("REPLACE INTO explore_id VALUES (?);", (id_,))
-            await self.database.commit()
+            self.__update_index(id_, True)
+            await self._write(
+                "REPLACE INTO explore_id VALUES (?);", (id_,), id_, (id_,)
+            )
 
-    async def __delete(self, id_: str) -> None:
+    def __delete(self, id_: str) -> None:
         if id_:
-            await self.database.execute("DELETE FROM explore_id WHERE ID=?", (id_,))
-            await self.database.commit()
+            self.buffer.append(("DELETE FROM explore_id WHERE ID=?", (id_,), id_))
+            self.pending[id_] = None
+            self.__update_index(id_, False)
 
     async def delete(self, ids: list[str]):
         if self.switch:
-            [await self.__delete(i) for i in ids]
+            for i in ids:
+                self.__delete(i)
+            await self.flush()
 
     async def all(self):
         if self.switch:
+            await self.flush()
             await self.cursor.execute("SELECT ID FROM explore_id")
             return [i[0] for i in await self.cursor.fetchmany()]
 
+    async def _write(
+        self,
+        sql: str,
+        parameters: tuple,
+        key: str = None,
+        row: tuple = None,
+    ) -> None:
+        """写入缓冲区，key 不为空时缓存待提交的数据供 select 查询"""
+        self.buffer.append((sql, parameters, key))
+        if key is not None:
+            self.pending[key] = row
+        if len(self.buffer) >= self.BATCH_SIZE:
+            await self.flush()
+        elif not self.timer or self.timer.done():
+            self.timer = create_task(self.__delayed_flush())
+
+    async def __delayed_flush(self) -> None:
+        try:
+            await sleep(self.FLUSH_INTERVAL)
+        except CancelledError:
+            return
+        # 关闭数据库时取消计时任务，不能中断正在进行的提交
+        try:
+            await shield(self.flush())
+        except CancelledError:
+            raise
+        except Exception as error:
+            logging(
+                None,
+                _("写入 {0} 失败，等待下次提交：{1}").format(
+                    self.file.name, repr(error)
+                ),
+                ERROR,
+            )
+
+    async def flush(self) -> None:
+        """在同一个事务中批量执行缓冲区的全部写入"""
+        async with self.lock:
+            if not self.buffer:
+                return
+            batch, self.buffer = self.buffer, []
+            written = {
+                key: self.pending[key]
+                for _, _, key in batch
+                if key is not None and key in self.pending
+            }
+            try:
+                with self.metrics.timer("record", table=self.file.stem):
+                    for sql, group in groupby(batch, key=itemgetter(0)):
+                        await self.database.executemany(sql, [i[1] for i in group])
+                    await self.database.commit()
+            except BaseException:
+                # 写入失败时回滚事务，将数据放回缓冲区等待下次提交
+                self.buffer[:0] = batch
+                await shield(self.database.rollback())
+                raise
+            self.metrics.inc("xhs_records_total", len(batch), table=self.file.stem)
+            for key, row in written.items():
+                if self.pending.get(key, self.UNSET) == row:
+                    del self.pending[key]
+
+    async def close(self) -> None:
+        if self.timer:
+            self.timer.cancel()
+        if self.index_task:
+            self.index_task.cancel()
+        await self.flush()
+        with suppress(CancelledError):
+            await self.cursor.close()
+        await self.database.close()
+
     async def __aenter__(self):
         await self._connect_database()
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        with suppress(CancelledError):
-            await self.cursor.close()
-        await self.database.close()
+        await self.close()
 
 
 class DataRecorder(IDRecorder):
@@ -94,6 +265,7 @@ class DataRecorder(IDRecorder):
 
     async def _connect_database(self):
         self.database = await connect(self.file)
+        await self._tune_database()
         self.cursor = await self.database.cursor()
         await self.database.execute(f"""CREATE TABLE IF NOT EXISTS explore_data (
         {",".join(" ".join(i) for i in self.DATA_TABLE)}
@@ -103,9 +275,12 @@ class DataRecorder(IDRecorder):
     async def select(self, id_: str):
         pass
 
+    async def select_many(self, ids: list[str]) -> set[str]:
+        return set()
+
     async def add(self, **kwargs) -> None:
         if self.switch:
-            await self.database.execute(
+            await self._write(
                 f"""REPLACE INTO explore_data (
         {", ".join(i[0] for i in self.DATA_TABLE)}
         ) VALUES (
@@ -113,7 +288,6 @@ class DataRecorder(IDRecorder):
         );""",
                 self.__generate_values(kwargs),
             )
-            await self.database.commit()
 
     async def __delete(self, id_: str) -> None:
         pass
@@ -136,6 +310,7 @@ class MapRecorder(IDRecorder):
 
     async def _connect_database(self):
         self.database = await connect(self.file)
+        await self._tune_database()
         self.cursor = await self.database.cursor()
         await self.database.execute(
             "CREATE TABLE IF NOT EXISTS mapping_data ("
@@ -147,21 +322,27 @@ class MapRecorder(IDRecorder):
 
     async def select(self, id_: str):
         if self.switch:
-            await self.cursor.execute(
+            if (row := self.pending.get(id_, self.UNSET)) is not self.UNSET:
+                return row
+            async with self.database.execute(
                 "SELECT NAME FROM mapping_data WHERE ID=?", (id_,)
-            )
-            return await self.cursor.fetchone()
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def select_many(self, ids: list[str]) -> set[str]:
+        return set()
 
     async def add(self, id_: str, name: str, *args, **kwargs) -> None:
         if self.switch:
-            await self.database.execute(
+            await self._write(
                 "REPLACE INTO mapping_data VALUES (?, ?);",
                 (
                     id_,
                     name,
                 ),
+                id_,
+                (name,),
             )
-            await self.database.commit()
 
     async def __delete(self, id_: str) -> None:
         pass
@@ -171,5 +352,244 @@ class MapRecorder(IDRecorder):
 
     async def all(self):
         if self.switch:
+            await self.flush()
             await self.cursor.execute("SELECT ID, NAME FROM mapping_data")
             return [i[0] for i in await self.cursor.fetchmany()]
+
+
+class LinkRecorder(IDRecorder):
+    """缓存作品短链接的解析结果，超过有效期的记录视为不存在"""
+
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.root.joinpath("LinkCache.db")
+        self.ttl = manager.link_cache_ttl * 3600
+        self.switch = self.ttl > 0
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        await self._tune_database()
+        self.cursor = await self.database.cursor()
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS short_link ("
+            "URL TEXT PRIMARY KEY,"
+            "TARGET TEXT NOT NULL,"
+            "TIME REAL NOT NULL"
+            ");"
+        )
+        await self.database.execute(
+            "DELETE FROM short_link WHERE TIME<?", (time() - self.ttl,)
+        )
+        await self.database.commit()
+
+    async def select(self, id_: str):
+        if self.switch:
+            if (row := self.pending.get(id_, self.UNSET)) is not self.UNSET:
+                return row
+            async with self.database.execute(
+                "SELECT TARGET FROM short_link WHERE URL=? AND TIME>=?",
+                (id_, time() - self.ttl),
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def select_many(self, ids: list[str]) -> set[str]:
+        return set()
+
+    async def add(self, id_: str, name: str, *args, **kwargs) -> None:
+        if self.switch:
+            await self._write(
+                "REPLACE INTO short_link VALUES (?, ?, ?);",
+                (
+                    id_,
+                    name,
+                    time(),
+                ),
+                id_,
+                (name,),
+            )
+
+    async def __delete(self, id_: str) -> None:
+        pass
+
+    async def delete(self, ids: list[str]):
+        pass
+
+    async def all(self):
+        pass
+
+
+class NoteRecorder(IDRecorder):
+    """压缩保存作品数据，超过有效期的记录视为不存在，超过容量上限时删除最早写入的记录"""
+
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.root.joinpath("NoteCache.db")
+        self.ttl = manager.note_cache_ttl
+        self.limit = manager.note_cache_size * 1024 * 1024
+        self.switch = self.ttl > 0 and self.limit > 0
+        self.size = 0
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        await self._tune_database()
+        self.cursor = await self.database.cursor()
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS note_cache ("
+            "ID TEXT PRIMARY KEY,"
+            "DATA BLOB NOT NULL,"
+            "SIZE INTEGER NOT NULL,"
+            "TIME REAL NOT NULL"
+            ");"
+        )
+        await self.database.commit()
+        await self.__evict()
+
+    async def select(self, id_: str):
+        if self.switch:
+            if (row := self.pending.get(id_, self.UNSET)) is not self.UNSET:
+                return row
+            async with self.database.execute(
+                "SELECT DATA, TIME FROM note_cache WHERE ID=? AND TIME>=?",
+                (id_, time() - self.ttl),
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def select_many(self, ids: list[str]) -> set[str]:
+        return set()
+
+    async def add(self, id_: str, name: bytes, *args, **kwargs) -> None:
+        if self.switch:
+            now = time()
+            await self._write(
+                "REPLACE INTO note_cache VALUES (?, ?, ?, ?);",
+                (
+                    id_,
+                    name,
+                    len(name),
+                    now,
+                ),
+                id_,
+                (name, now),
+            )
+            self.size += len(name)
+            if self.size > self.limit:
+                await self.__evict()
+
+    async def __evict(self) -> None:
+        """删除过期记录，容量超出上限时按写入时间删除至上限的 80%"""
+        await self.flush()
+        await self.database.execute(
+            "DELETE FROM note_cache WHERE TIME<?", (time() - self.ttl,)
+        )
+        async with self.database.execute(
+            "SELECT COALESCE(SUM(SIZE), 0) FROM note_cache"
+        ) as cursor:
+            (self.size,) = await cursor.fetchone()
+        if self.size > self.limit:
+            excess = self.size - self.limit * 0.8
+            expired = []
+            async with self.database.execute(
+                "SELECT ID, SIZE FROM note_cache ORDER BY TIME"
+            ) as cursor:
+                async for id_, size in cursor:
+                    if excess <= 0:
+                        break
+                    expired.append((id_,))
+                    excess -= size
+                    self.size -= size
+            await self.database.executemany(
+                "DELETE FROM note_cache WHERE ID=?", expired
+            )
+        await self.database.commit()
+
+    async def __delete(self, id_: str) -> None:
+        pass
+
+    async def delete(self, ids: list[str]):
+        pass
+
+    async def all(self):
+        pass
+
+
+class JobRecorder(IDRecorder):
+    """保存 Web API 后台任务的状态、参数与结果，服务重启后恢复未完成的任务"""
+
+    def __init__(self, manager: "Manager"):
+        super().__init__(manager)
+        self.file = manager.root.joinpath("JobData.db")
+        self.switch = True
+
+    async def _connect_database(self):
+        self.database = await connect(self.file)
+        await self._tune_database()
+        self.cursor = await self.database.cursor()
+        await self.database.execute(
+            "CREATE TABLE IF NOT EXISTS job_data ("
+            "ID TEXT PRIMARY KEY,"
+            "STATUS TEXT NOT NULL,"
+            "PARAMS TEXT NOT NULL,"
+            "RESULT TEXT,"
+            "CREATED REAL NOT NULL,"
+            "UPDATED REAL NOT NULL"
+            ");"
+        )
+        await self.database.commit()
+
+    async def select(self, id_: str):
+        if (row := self.pending.get(id_, self.UNSET)) is not self.UNSET:
+            return row
+        async with self.database.execute(
+            "SELECT ID, STATUS, PARAMS, RESULT, CREATED, UPDATED "
+            "FROM job_data WHERE ID=?",
+            (id_,),
+        ) as cursor:
+            return await cursor.fetchone()
+
+    async def select_many(self, ids: list[str]) -> set[str]:
+        return set()
+
+    async def purge(self, statuses: tuple[str, ...], before: float) -> int:
+        """删除指定状态且最后更新时间早于 before 的任务"""
+        await self.flush()
+        cursor = await self.database.execute(
+            "DELETE FROM job_data WHERE STATUS IN "
+            f"({', '.join('?' * len(statuses))}) AND UPDATED<?;",
+            (*statuses, before),
+        )
+        await self.database.commit()
+        return cursor.rowcount
+
+    async def add(
+        self,
+        id_: str,
+        status: str,
+        params: str,
+        result: str | None,
+        created: float,
+        updated: float,
+        *args,
+        **kwargs,
+    ) -> None:
+        row = (id_, status, params, result, created, updated)
+        await self._write(
+            "REPLACE INTO job_data VALUES (?, ?, ?, ?, ?, ?);",
+            row,
+            id_,
+            row,
+        )
+
+    async def __delete(self, id_: str) -> None:
+        pass
+
+    async def delete(self, ids: list[str]):
+        pass
+
+    async def all(self):
+        """返回全部未完成的任务，按创建时间排序"""
+        await self.flush()
+        async with self.database.execute(
+            "SELECT ID, STATUS, PARAMS, RESULT, CREATED, UPDATED "
+            "FROM job_data WHERE STATUS IN ('queued', 'running') ORDER BY CREATED"
+        ) as cursor:
+            return await cursor.fetchall()
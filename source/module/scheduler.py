@@ -0,0 +1,225 @@
+from asyncio import CancelledError, get_running_loop
+from collections import deque
+from contextlib import suppress
+from time import monotonic
+
+from .tools import classify_error
+
+__all__ = [
+    "ResizableSemaphore",
+    "AdaptiveLimiter",
+    "DownloadScheduler",
+    "create_limiter",
+]
+
+
+class ResizableSemaphore:
+    """支持运行时调整上限的信号量，调小上限时不会中断已获取的任务"""
+
+    def __init__(self, limit: int):
+        self.limit = max(int(limit), 1)
+        self.active = 0
+        self.waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(not i.done() for i in self.waiters)
+
+    @property
+    def capacity(self) -> int:
+        return self.limit
+
+    def locked(self) -> bool:
+        return self.active >= self.limit
+
+    def feedback(
+        self,
+        latency: float = None,
+        error: BaseException = None,
+    ) -> None:
+        """记录请求结果，固定上限的信号量不做处理"""
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
+        future = get_running_loop().create_future()
+        self.waiters.append(future)
+        try:
+            await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                with suppress(ValueError):
+                    self.waiters.remove(future)
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self.__wake()
+
+    def resize(self, limit: int) -> None:
+        self.limit = max(int(limit), 1)
+        self.__wake()
+
+    def __wake(self) -> None:
+        while self.waiters and self.active < self.limit:
+            future = self.waiters.popleft()
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+
+    def status(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+        }
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class AdaptiveLimiter(ResizableSemaphore):
+    """AIMD 并发控制：延迟与成功率正常时逐步提高上限，遇到限流、服务端错误或超时时成倍降低上限"""
+
+    SCALE = 4
+    SMOOTHING = 0.2
+    DRIFT = 1.001
+
+    def __init__(
+        self,
+        limit: int,
+        minimum: int = 1,
+        maximum: int = None,
+        factor: float = 0.5,
+        tolerance: float = 2.0,
+    ):
+        super().__init__(limit)
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum or self.limit * self.SCALE, self.limit)
+        self.factor = factor
+        self.tolerance = tolerance
+        self.latency: float | None = None
+        self.baseline: float | None = None
+        self.window = 0
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.throttled = 0
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.maximum
+
+    def resize(self, limit: int) -> None:
+        self.maximum = max(self.maximum, int(limit))
+        super().resize(limit)
+
+    def feedback(
+        self,
+        latency: float = None,
+        error: BaseException = None,
+    ) -> None:
+        if self.is_throttled(error):
+            self.__decrease()
+        elif error:
+            self.failures += 1
+        else:
+            self.__increase(latency)
+
+    @staticmethod
+    def is_throttled(error: BaseException | None) -> bool:
+        return error is not None and classify_error(error) in {
+            "timeout",
+            "throttled",
+            "server",
+        }
+
+    def __decrease(self) -> None:
+        self.throttled += 1
+        self.window = 0
+        now = monotonic()
+        # 同一个延迟周期内只降低一次上限
+        if now - self.last_decrease < max(self.latency or 0, 1.0):
+            return
+        self.last_decrease = now
+        if (limit := max(self.minimum, int(self.limit * self.factor))) < self.limit:
+            self.decreases += 1
+            super().resize(limit)
+
+    def __increase(self, latency: float | None) -> None:
+        self.successes += 1
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + (latency - self.latency) * self.SMOOTHING
+            )
+            self.baseline = min(
+                self.latency,
+                (self.baseline or self.latency) * self.DRIFT,
+            )
+        self.window += 1
+        if self.window >= self.limit and self.limit < self.maximum and self.__healthy():
+            self.window = 0
+            self.increases += 1
+            super().resize(self.limit + 1)
+
+    def __healthy(self) -> bool:
+        if self.latency is None:
+            return True
+        return self.latency <= self.baseline * self.tolerance
+
+    def status(self) -> dict:
+        return super().status() | {
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "latency": self.latency,
+            "baseline": self.baseline,
+            "successes": self.successes,
+            "failures": self.failures,
+            "throttled": self.throttled,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+def create_limiter(limit: int, adaptive: bool = False) -> ResizableSemaphore:
+    return AdaptiveLimiter(limit) if adaptive else ResizableSemaphore(limit)
+
+
+class DownloadScheduler:
+    """按文件类型（对应不同的 CDN 主机）分别限制下载并发数量"""
+
+    def __init__(
+        self,
+        image: int,
+        video: int,
+        live: int,
+        adaptive: bool = False,
+    ):
+        self.slots = {
+            "image": create_limiter(image, adaptive),
+            "video": create_limiter(video, adaptive),
+            "live": create_limiter(live, adaptive),
+        }
+
+    def slot(self, kind: str) -> ResizableSemaphore:
+        return self.slots[kind]
+
+    def update(self, **limits: int | None) -> dict:
+        for kind, limit in limits.items():
+            if kind in self.slots and limit:
+                self.slots[kind].resize(limit)
+        return self.status()
+
+    def status(self) -> dict:
+        return {k: v.status() for k, v in self.slots.items()}
@@ -2,7 +2,7 @@ from json import dump, load
 from pathlib import Path
 from platform import system
 
-from .static import ROOT, USERAGENT
+from .static import MAX_WORKERS, ROOT, USERAGENT
 
 __all__ = ["Settings"]
 
@@ -29,6 +29,25 @@ class Settings:
         "author_archive": False,
         "write_mtime": False,
         "markdown_record": False,
+        "concurrency": 4,
+        "request_rate": 2.0,
+        "segment_threshold": 1024 * 1024 * 16,
+        "segment_count": 4,
+        "image_concurrency": MAX_WORKERS,
+        "video_concurrency": 2,
+        "live_concurrency": 2,
+        "adaptive_concurrency": False,
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "http2": False,
+        "link_cache_ttl": 12,
+        "note_cache_ttl": 300,
+        "note_cache_size": 256,
+        "job_workers": 2,
+        "parse_workers": 0,
+        "parse_warmup": True,
+        "download_rate": 2.0,
+        "bandwidth_limit": 0,
         "language": "zh_CN",
     }
     encode = "UTF-8-SIG" if system() == "Windows" else "UTF-8"
@@ -1,6 +1,8 @@
 from asyncio import sleep
+from contextvars import ContextVar
 from random import uniform
 
+from httpx import HTTPStatusError, TimeoutException, TransportError
 from rich import print
 from rich.text import Text
 
@@ -8,14 +10,108 @@ from ..translation import _
 from .static import INFO
 
 
+def classify_error(error: BaseException | None) -> str:
+    """错误分类：timeout、throttled、server、client、network、other；None 表示未知失败"""
+    if error is None:
+        return "unknown"
+    if isinstance(error, TimeoutException):
+        return "timeout"
+    if isinstance(error, HTTPStatusError):
+        if (code := error.response.status_code) == 429:
+            return "throttled"
+        return "server" if code >= 500 else "client"
+    if isinstance(error, TransportError):
+        return "network"
+    return "other"
+
+
+class RetryPolicy:
+    """指数退避 + 完全随机抖动的重试策略，客户端错误不重试，重试次数受本次运行的重试预算限制"""
+
+    RETRYABLE = {"unknown", "timeout", "throttled", "server", "network"}
+
+    def __init__(
+        self,
+        max_retry: int,
+        base: float = 0.5,
+        cap: float = 16.0,
+        ratio: float = 0.2,
+        reserve: float = 10.0,
+    ):
+        self.max_retry = max_retry
+        self.base = base
+        self.cap = cap
+        self.ratio = ratio
+        self.reserve = reserve
+        self.budget = reserve
+        self.error: ContextVar[BaseException | None] = ContextVar(
+            "retry_error",
+            default=None,
+        )
+        self.attempts = 0
+        self.retries: dict[str, int] = {}
+        self.failures: dict[str, int] = {}
+        self.exhausted = 0
+
+    def record(self, error: BaseException) -> None:
+        """记录本次调用失败的原因，供重试装饰器判断是否重试"""
+        self.error.set(error)
+
+    def take(self) -> BaseException | None:
+        error = self.error.get()
+        self.error.set(None)
+        return error
+
+    def deposit(self) -> None:
+        self.attempts += 1
+        self.budget = min(self.budget + self.ratio, self.reserve * 10)
+
+    def should_retry(self, attempt: int, error: BaseException | None) -> bool:
+        type_ = classify_error(error)
+        if attempt >= self.max_retry or type_ not in self.RETRYABLE:
+            self.failures[type_] = self.failures.get(type_, 0) + 1
+            return False
+        if self.budget < 1:
+            self.exhausted += 1
+            self.failures[type_] = self.failures.get(type_, 0) + 1
+            return False
+        self.budget -= 1
+        self.retries[type_] = self.retries.get(type_, 0) + 1
+        return True
+
+    def delay(self, attempt: int, error: BaseException | None = None) -> float:
+        delay = uniform(0, min(self.cap, self.base * 2**attempt))
+        if (
+            isinstance(error, HTTPStatusError)
+            and (after := error.response.headers.get("Retry-After", "")).isdigit()
+        ):
+            delay = max(delay, min(float(after), self.cap))
+        return delay
+
+    def status(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "budget": self.budget,
+            "retries": self.retries.copy(),
+            "failures": self.failures.copy(),
+            "exhausted": self.exhausted,
+        }
+
+
 def retry(function):
     async def inner(self, *args, **kwargs):
-        if result := await function(self, *args, **kwargs):
-            return result
-        for __ in range(self.retry):
+        policy: RetryPolicy = self.retry
+        attempt = 0
+        while True:
+            policy.deposit()
             if result := await function(self, *args, **kwargs):
+                policy.take()
+                return result
+            error = policy.take()
+            if not policy.should_retry(attempt, error):
                 return result
-        return result
+            await sleep(policy.delay(attempt, error))
+            attempt += 1
 
     return inner
 